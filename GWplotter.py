@@ -9,6 +9,7 @@ import matplotlib.lines as mlines
 import numpy as np
 import os
 from plotinterferometer import plot_all_interferometers
+import spectrumstore
 
 # Get the current working directory
 current_dir = os.getcwd()
@@ -16,13 +17,18 @@ current_dir = os.getcwd()
 # Define the name of the folder containing the data
 folder_name = '2hdmGWdata'
 
+# stores to take the spectra from instead of the text files, e.g. 'DWCSGW_store'
+# and 'CSGW_store' to plot new scans, see spectrumstore.load_spectrum
+dw_store_path = None
+cs_store_path = None
+
 # Now we load and plot the pre-calculated GW spectrum.
 
 # GW spectrum for U(1) breaking at 10^{12} GeV, Z2 breaking at 246 GeV
 def plot_Lambda12():
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_12.0_246.0.txt')
-    data12 = np.loadtxt(file_path)
+    data12 = spectrumstore.load_spectrum(file_path, dw_store_path)
     
     # separate the columns
     freq = data12[:, 0]
@@ -30,7 +36,7 @@ def plot_Lambda12():
     
     # pure CS case
     file_path = os.path.join(current_dir, folder_name, 'CSGW_12.0.txt')
-    dataCS12 = np.loadtxt(file_path)
+    dataCS12 = spectrumstore.load_spectrum(file_path, cs_store_path)
     
     # separate the columns
     freqCS = dataCS12[:, 0]
@@ -46,9 +52,9 @@ def plot_Lambda12():
 
 # GW spectrum for U(1) breaking at 10^{13} GeV, Z2 breaking at 246 GeV
 def plot_Lambda13():
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_13.0_246.0.txt')
-    data13 = np.loadtxt(file_path)
+    data13 = spectrumstore.load_spectrum(file_path, dw_store_path)
     
     # separate the columns
     freq = data13[:, 0]
@@ -56,7 +62,7 @@ def plot_Lambda13():
     
     # pure CS case
     file_path = os.path.join(current_dir, folder_name, 'CSGW_13.0.txt')
-    dataCS13 = np.loadtxt(file_path)
+    dataCS13 = spectrumstore.load_spectrum(file_path, cs_store_path)
     
     # separate the columns
     freqCS = dataCS13[:, 0]
@@ -72,9 +78,9 @@ def plot_Lambda13():
 
 # GW spectrum for U(1) breaking at 10^{14} GeV, Z2 breaking at 246 GeV
 def plot_Lambda14():
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_14.0_246.0.txt')
-    data14 = np.loadtxt(file_path)
+    data14 = spectrumstore.load_spectrum(file_path, dw_store_path)
     
     # separate the columns
     freq = data14[:, 0]
@@ -82,7 +88,7 @@ def plot_Lambda14():
     
     # pure CS case
     file_path = os.path.join(current_dir, folder_name, 'CSGW_14.0.txt')
-    dataCS14 = np.loadtxt(file_path)
+    dataCS14 = spectrumstore.load_spectrum(file_path, cs_store_path)
     
     # separate the columns
     freqCS = dataCS14[:, 0]
@@ -98,9 +104,9 @@ def plot_Lambda14():
 
 # GW spectrum for U(1) breaking at 10^{15} GeV, Z2 breaking at 246 GeV
 def plot_Lambda15():
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_15.0_246.0.txt')
-    data15 = np.loadtxt(file_path)
+    data15 = spectrumstore.load_spectrum(file_path, dw_store_path)
     
     # separate the columns
     freq = data15[:, 0]
@@ -108,7 +114,7 @@ def plot_Lambda15():
     
     # pure CS case
     file_path = os.path.join(current_dir, folder_name, 'CSGW_15.0.txt')
-    dataCS15 = np.loadtxt(file_path)
+    dataCS15 = spectrumstore.load_spectrum(file_path, cs_store_path)
     
     # separate the columns
     freqCS = dataCS15[:, 0]
@@ -124,43 +130,52 @@ def plot_Lambda15():
     
     
 # Set font family to Latin Modern Roman for LaTeX text
-plt.rcParams['font.family'] = 'Latin Modern Roman'
-
-plt.rcParams.update({
+latex_style = {
     "text.usetex": True,
     "font.family": "Latin Modern Roman"
-})
+}
 
+# prepare ax (the current axes by default) for a GW spectrum figure: ticks on
+# all sides, the displayed range, the labels and the interferometer plots.
+# Also used for the background of the batch figures, see batchplot.py.
+def spectrum_axes(ax=None):
+    ax = plt.gca() if ax is None else ax
+    # Adding ticks on all sides
+    ax.tick_params(axis='both', which='both', direction='in', bottom=True, top=True, left=True, right=True)
+    # set axis limits to be displayed
+    ax.set_xlim(1e-9, 1e4)
+    ax.set_ylim(1e-18, 1e-7)
+    # put labels on the axes
+    ax.set_xlabel(r'$f$ [Hz]')
+    ax.set_ylabel(r'$\Omega_{\mathrm{GW}}h^2$')
+    plot_all_interferometers(ax) # interferometer plots
+    return ax
 
 # make the final plot   
- 
-fig, ax = plt.subplots(figsize=(4*1.67, 4), dpi=600)
-# Adding ticks on all sides
-plt.tick_params(axis='both', which='both', direction='in', bottom=True, top=True, left=True, right=True)
-# set axis limits to be displayed
-plt.xlim(1e-9, 1e4)
-plt.ylim(1e-18, 1e-7)
-# put labels on the axes
-plt.xlabel(r'$f$ [Hz]')
-plt.ylabel(r'$\Omega_{\mathrm{GW}}h^2$')
-
-# Now we combine all the plots into one
-plot_all_interferometers() # interferometer plots
-plot_Lambda12() # GW spectrum for U(1) breaking at 10^{12} GeV, Z2 breaking at 246 GeV
-plot_Lambda13() # GW spectrum for U(1) breaking at 10^{13} GeV, Z2 breaking at 246 GeV
-plot_Lambda14() # GW spectrum for U(1) breaking at 10^{14} GeV, Z2 breaking at 246 GeV
-plot_Lambda15() # GW spectrum for U(1) breaking at 10^{15} GeV, Z2 breaking at 246 GeV
-
-# plot legend
-line_blank = mlines.Line2D([], [], color='blue', linestyle=' ', linewidth=0.5, label=r'$v_{\mathrm{SM}} = 246$ GeV')
-line_purple = mlines.Line2D([], [], color='purple', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{12}\ {\rm GeV}$')
-line_blue = mlines.Line2D([], [], color='darkblue', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{13}\ {\rm GeV}$')
-line_orange = mlines.Line2D([], [], color='orange', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{{14}}\ {\rm GeV}$')
-line_red = mlines.Line2D([], [], color='red', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{15}\ {\rm GeV}$')
-plt.legend(handles=[line_blank, line_purple, line_blue, line_orange, line_red], loc = (0.74,0.045), framealpha=0.2, fontsize=8, edgecolor='black') #best upper-right
-
-# save the figure
-plt.savefig('GWspectrum.png', dpi=600)
+def plot_spectra():
+    plt.rcParams.update(latex_style)
+    fig, ax = plt.subplots(figsize=(4*1.67, 4), dpi=600)
+    spectrum_axes(ax)
+    
+    # Now we combine all the plots into one
+    plot_Lambda12() # GW spectrum for U(1) breaking at 10^{12} GeV, Z2 breaking at 246 GeV
+    plot_Lambda13() # GW spectrum for U(1) breaking at 10^{13} GeV, Z2 breaking at 246 GeV
+    plot_Lambda14() # GW spectrum for U(1) breaking at 10^{14} GeV, Z2 breaking at 246 GeV
+    plot_Lambda15() # GW spectrum for U(1) breaking at 10^{15} GeV, Z2 breaking at 246 GeV
+    
+    # plot legend
+    line_blank = mlines.Line2D([], [], color='blue', linestyle=' ', linewidth=0.5, label=r'$v_{\mathrm{SM}} = 246$ GeV')
+    line_purple = mlines.Line2D([], [], color='purple', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{12}\ {\rm GeV}$')
+    line_blue = mlines.Line2D([], [], color='darkblue', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{13}\ {\rm GeV}$')
+    line_orange = mlines.Line2D([], [], color='orange', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{{14}}\ {\rm GeV}$')
+    line_red = mlines.Line2D([], [], color='red', linestyle='-', linewidth=1.5, label=r'$v_{\mathrm M} = 10^{15}\ {\rm GeV}$')
+    plt.legend(handles=[line_blank, line_purple, line_blue, line_orange, line_red], loc = (0.74,0.045), framealpha=0.2, fontsize=8, edgecolor='black') #best upper-right
+    
+    # save the figure
+    plt.savefig('GWspectrum.png', dpi=600)
+    
+    # show plot
+    plt.show()
 
-# show plot
-plt.show()
+if __name__ == "__main__":
+    plot_spectra()
@@ -1,46 +1,71 @@
 """
 This script is designed to run in a cluster for parallelizing the computation
 over many k modes. If parallelization is not desired, use GWspectrumcalc.py
-instead.
+instead. For long scans over a grid of (Lambda, v) that should survive the
+loss of a node, use distributedscan.py.
 
 """
 import numpy as np
-import multiprocessing
+import parallelscan
+import adaptivegrid
+import spectrumstore
 from dwboundedbycs import DWBoundedbyCS
 
-defectGW = DWBoundedbyCS()
+defectGW = None # built on first use, see defect()
 
 # specify the user parameters ----------------------
 kmax = 10000 # how many k-modes to sum up to
 Lambda_val = 1e12 # U(1) symmetry breaking scale
 v_val = 246. # Intermediate Z2 breaking scale
+resum = False # build the k-mode sum from the k = 1 spectrum, see kmodesum.py
+cache_path = None # e.g. 'OmegaGW_cache.sqlite' to reuse previously calculated (f, k) cells
+processes = None # number of worker processes, None for all cores
+kchunk = None # k-modes per work unit, None for about four units per process and frequency
+adaptive = False # refine the frequency grid where the spectrum needs it, see adaptivegrid.py
+rtol = 0.01 # accuracy of the log-log interpolation between adaptive frequencies
+store_path = 'DWCSGW_store' # spectra are added to this store, see spectrumstore.py
 # --------------------------------------------------
 
 # evaluate GW spectrum for the frequency list flist, summing the k-modes
-# from k = 1 up to k = kmax
+# from k = 1 up to k = kmax. All (frequency, k-chunk) work units are handed
+# to the pool at once, see parallelscan.py
 def evaluate_parallel(Lambda, v, flist, klist):
-    # Create a pool of processes
-    with multiprocessing.Pool() as pool:
-        results = []
-        # Apply the function to each element of blist in parallel
-        for freq in flist:
-            result_f = sum(pool.starmap(defectGW.OmegaGWcalcDWCS, [(Lambda, v, freq, kval) for kval in klist]))
-            results.append(result_f)
+    return parallelscan.evaluate_parallel(defect(), 'OmegaGWcalcDWCS', (Lambda, v), flist, klist,
+                                          processes=processes, kchunk=kchunk)
 
-    return results
+# the DWBoundedbyCS object of this process, built when it is first needed
+def defect():
+    global defectGW
+    if defectGW is None:
+        defectGW = DWBoundedbyCS()
+        if cache_path is not None:
+            defectGW.use_cache(cache_path)
+    return defectGW
 
-if __name__ == "__main__":
+# calculate the spectrum for the user parameters above and add it to the store
+def main():
     Lambda = Lambda_val
     v = v_val
     flist = np.logspace(-9, 5, 30)  # frequency in the observable range
     klist = range(1, kmax + 1)  # all k-modes
 
-    omega_gw_spectrum = evaluate_parallel(Lambda, v, flist, klist)
+    def spectrum(flist):
+        if resum:
+            return defect().OmegaGWresumDWCS(Lambda, v, flist, kmax)
+        return evaluate_parallel(Lambda, v, flist, klist)
+
+    if adaptive:
+        flist, omega_gw_spectrum = adaptivegrid.adaptive_spectrum(spectrum, flist[0], flist[-1], rtol)
+    else:
+        omega_gw_spectrum = spectrum(flist)
     
     final_result = np.column_stack((flist,omega_gw_spectrum))
 
     print("GW spectrum vs frequency:", final_result)
     
-    # save results in a text file
-    np.savetxt(f'DWCSGW_{np.log10(Lambda_val)}_{v_val}.txt', final_result)
-    
+    # add the spectrum to the store of all calculated spectra
+    with spectrumstore.SpectrumStore(store_path, ('Lambda', 'v')) as store:
+        store.append((Lambda, v), flist, omega_gw_spectrum)
+
+if __name__ == "__main__":
+    main()
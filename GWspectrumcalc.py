@@ -3,51 +3,68 @@ This script calculates the GW spectrum. This is intended to be used in a local
 computer for testing out the result for summing over small k-modes. For 30 frequency
 bins, it takes couple of minutes for kmax = 2.
 
-If parallelization is expected, use GWscanner.py 
+If parallelization is expected, use GWscanner.py
 
 """
 import numpy as np
 from dwboundedbycs import DWBoundedbyCS
 
-defectGW = DWBoundedbyCS()
+def DWspectrum(kmax=2):
+    defectGW = DWBoundedbyCS()
 
-kmax = 2
-
-flist = np.logspace(-9, 5, 30)
-result = np.array([0.] * len(flist))
-for i in range(len(result)):
-    result[i] = sum([defectGW.OmegaGWcalcDWCS(1e13, 246, flist[i], k) for k in range(1, kmax)])
+    flist = np.logspace(-9, 5, 30)
+    result = np.array([0.] * len(flist))
+    for i in range(len(result)):
+        result[i] = sum([defectGW.OmegaGWcalcDWCS(1e13, 246, flist[i], k) for k in range(1, kmax)])
 
-print(np.column_stack((flist, result)))
+    print(np.column_stack((flist, result)))
+    return result
 
 """
 This script calculates the GW spectrum for pure gauge CS. This is intended to be used in a local
 computer for testing out the result for summing over small k-modes. For 30 frequency
 bins, it takes couple of minutes for kmax = 2.
 
-If parallelization is expected, use GWscanner.py 
+If parallelization is expected, use GWscanner.py
 
 """
-import numpy as np
 from gaugedcs import CosmicString
+import spectrumstore
+import adaptivegrid
 
-defectGW = CosmicString()
+defectGW = None # built on first use, see defect()
 
 kmax = 100
 
 flist = np.logspace(-9, 5, 30)
+adaptive = False # refine the frequency grid where the spectrum needs it, see adaptivegrid.py
+
+# the CosmicString object of this process, built when it is first needed
+def defect():
+    global defectGW
+    if defectGW is None:
+        defectGW = CosmicString()
+    return defectGW
 
 def GWscanner(Lambda_val):
-    result = np.array([0.] * len(flist))
-    for i in range(len(result)):
-        result[i] = sum([defectGW.OmegaGWcalcCS(Lambda_val, flist[i], k) for k in range(1, kmax)])
-    final_result = np.column_stack((flist, result))
-    # save results in a text file
-    np.savetxt(f'CSGW_{np.log10(Lambda_val)}.txt', final_result)
+    # all frequencies and k-modes are evaluated together
+    spectrum = lambda fl: defect().OmegaGWspectrumCS(Lambda_val, fl, range(1, kmax))
+    if adaptive:
+        fl, result = adaptivegrid.adaptive_spectrum(spectrum, flist[0], flist[-1])
+    else:
+        fl, result = flist, spectrum(flist)
+    final_result = np.column_stack((fl, result))
+    # add the spectrum to the store of all calculated spectra, see spectrumstore.py
+    with spectrumstore.SpectrumStore('CSGW_store', ('Lambda',)) as store:
+        store.append((Lambda_val,), fl, result)
     return final_result
-    
-GWscanner(1.0e12)
-GWscanner(1.0e13)    
-GWscanner(1.0e14) 
-GWscanner(1.0e15) 
 
+def main():
+    DWspectrum()
+    GWscanner(1.0e12)
+    GWscanner(1.0e13)
+    GWscanner(1.0e14)
+    GWscanner(1.0e15)
+
+if __name__ == "__main__":
+    main()
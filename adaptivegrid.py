@@ -0,0 +1,76 @@
+"""
+This script samples a GW spectrum on an adaptive frequency grid. It starts
+from a coarse logarithmic grid and adds points only where they are needed:
+
+  - where the log-log interpolation between neighbouring points is not
+    accurate to rtol, estimated from the curvature of log Omega in log f
+    (the parabolas through the neighbouring points against the straight line)
+  - where the spectrum switches between zero and non-zero (e.g. the cutoff
+    induced by the domain walls), until the switch is located to rtol in f
+
+Plateaus and stretches where the spectrum vanishes keep the coarse spacing.
+All the points added in one refinement round are calculated in a single
+call, so batched or parallel spectrum functions stay efficient, e.g.
+
+    spectrum = lambda flist: defectGW.OmegaGWspectrumCS(Lambda, flist, range(1, kmax))
+    flist, Omega = adaptive_spectrum(spectrum, 1e-9, 1e5)
+
+"""
+import numpy as np
+
+# sample spectrum(flist) -> Omega between f_min and f_max. Starts from
+# ncoarse log-spaced frequencies and refines for at most max_points
+# frequencies in total. Intervals narrower than min_width decades are not
+# refined. Returns the frequencies and the spectrum on them, in order.
+def adaptive_spectrum(spectrum, f_min, f_max, rtol=0.01, ncoarse=15, max_points=200, min_width=1e-6):
+    x = np.linspace(np.log10(f_min), np.log10(f_max), ncoarse)
+    Omega = np.asarray(spectrum(10**x), dtype=float)
+    tol = np.log10(1 + rtol)
+    while len(x) < max_points:
+        error = interval_errors(x, Omega, tol)
+        refine = np.nonzero((error > tol) & (np.diff(x) > min_width))[0]
+        if len(refine) == 0:
+            break
+        # the largest errors first if the budget does not allow all of them
+        refine = refine[np.argsort(-error[refine], kind='stable')][:max_points - len(x)]
+        xnew = 0.5 * (x[refine] + x[refine + 1])
+        Omeganew = np.asarray(spectrum(10**xnew), dtype=float)
+        order = np.argsort(np.concatenate((x, xnew)), kind='stable')
+        x = np.concatenate((x, xnew))[order]
+        Omega = np.concatenate((Omega, Omeganew))[order]
+    return 10**x, Omega
+
+# error estimate in log10 Omega of the log-log interpolation in every interval
+# of the grid x = log10 f. Intervals where the spectrum switches between zero
+# and non-zero get their width in log10 f, compared with the same tolerance.
+# Intervals where it vanishes at both ends are not refined.
+def interval_errors(x, Omega, tol):
+    positive = Omega > 0
+    y = np.log10(np.where(positive, Omega, 1.))
+    n = len(x)
+    error = np.zeros(n - 1)
+    if n < 3:
+        return error
+    xmid = 0.5 * (x[:-1] + x[1:])
+    linear = 0.5 * (y[:-1] + y[1:])
+    # parabola through the points i-1, i, i+1 at the middle of interval i
+    # (left) and through i, i+1, i+2 at the middle of interval i (right)
+    for shift in (-1, 1):
+        i = np.arange(n - 1)
+        j = i + (0 if shift == 1 else -1) # first point of the three
+        ok = (j >= 0) & (j + 2 < n)
+        j = j[ok]
+        valid = positive[j] & positive[j + 1] & positive[j + 2]
+        q = parabola(x[j], x[j + 1], x[j + 2], y[j], y[j + 1], y[j + 2], xmid[i[ok]])
+        deviation = np.where(valid, np.abs(q - linear[i[ok]]), 0.)
+        error[i[ok]] = np.maximum(error[i[ok]], deviation)
+    switch = positive[:-1] != positive[1:]
+    error[switch] = np.maximum(error[switch], np.diff(x)[switch])
+    error[~(positive[:-1] | positive[1:])] = 0.
+    return error
+
+# value at xm of the parabola through (x0, y0), (x1, y1), (x2, y2)
+def parabola(x0, x1, x2, y0, y1, y2, xm):
+    return y0 * (xm - x1) * (xm - x2) / ((x0 - x1) * (x0 - x2)) + \
+           y1 * (xm - x0) * (xm - x2) / ((x1 - x0) * (x1 - x2)) + \
+           y2 * (xm - x0) * (xm - x1) / ((x2 - x0) * (x2 - x1))
@@ -0,0 +1,28 @@
+"""
+This file writes binary .npy files atomically: the array is written to a
+temporary file next to the target, which is then renamed over it, so that a
+reader never sees a half written file, also when several processes or nodes
+write the same file. It is shared by the caches of parsed data files
+(cosmobackground.py, detectors.py), the spectrum store (spectrumstore.py) and
+the distributed scans (distributedscan.py), and only depends on numpy.
+
+"""
+import os
+import socket
+import numpy as np
+
+# write data to the .npy file at path; raises OSError if it cannot be written
+def save_array(path, data):
+    tmp_path = f'{path}.{socket.gethostname()}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        np.save(file, data)
+    os.replace(tmp_path, path)
+
+# as save_array, but returns False instead of raising if the file cannot be
+# written, e.g. in a read-only data directory
+def try_save_array(path, data):
+    try:
+        save_array(path, data)
+    except OSError:
+        return False
+    return True
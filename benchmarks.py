@@ -0,0 +1,200 @@
+"""
+This script is a benchmark suite for the hot paths of the package: single
+GW amplitudes of both defects, full spectra at several kmax, the SNR of a
+spectrum for all interferometers, the plot of all interferometers, the
+startup of the defect classes and the import of the modules and scripts (see
+startupbench.py). It runs offline from
+the data files in the repository and writes the timings as JSON:
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --save-baseline bench_baseline.json
+    python benchmarks.py --baseline bench_baseline.json
+
+Every benchmark is called once to warm up (loading tables, compiling
+kernels) and then timed over several repeats; the median and the minimum
+are stored. Compared with a baseline, a benchmark whose median is slower
+than the baseline median by more than the threshold (20% by default) is
+flagged as a regression, and the script exits with status 1.
+
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+
+flist = np.logspace(-9, 5, 30) # the frequency bins of GWscanner.py
+
+# each setup function prepares the objects it needs and returns the call to
+# time; these are the benchmarks keyed by name
+def setup_calcCS(backend='numpy'):
+    from gaugedcs import CosmicString
+    defectGW = CosmicString()
+    defectGW.backend = backend
+    return lambda: defectGW.OmegaGWcalcCS(1e13, 1e-3, 1)
+
+def setup_calcDWCS(backend='numpy'):
+    from dwboundedbycs import DWBoundedbyCS
+    defectGW = DWBoundedbyCS()
+    defectGW.backend = backend
+    return lambda: defectGW.OmegaGWcalcDWCS(1e13, 246., 1e-2, 1)
+
+# the batched CS spectrum over all frequencies and k-modes below kmax
+def setup_spectrumCS(kmax):
+    from gaugedcs import CosmicString
+    defectGW = CosmicString()
+    return lambda: defectGW.OmegaGWspectrumCS(1e13, flist, range(1, kmax))
+
+# the DW spectrum mode by mode, as in GWspectrumcalc.py
+def setup_spectrumDWCS(kmax):
+    from dwboundedbycs import DWBoundedbyCS
+    defectGW = DWBoundedbyCS()
+    return lambda: [sum(defectGW.OmegaGWcalcDWCS(1e13, 246., freq, k) for k in range(1, kmax)) for freq in flist]
+
+# the DW spectrum from the fundamental mode, as in GWscanner.py
+def setup_resumDWCS(kmax):
+    from dwboundedbycs import DWBoundedbyCS
+    defectGW = DWBoundedbyCS()
+    return lambda: defectGW.OmegaGWresumDWCS(1e13, 246., flist, kmax)
+
+# a 4 x 4 (Lambda, v) map of DW spectra, one batch per call
+def setup_gridDWCS(kmax):
+    from dwboundedbycs import DWBoundedbyCS
+    defectGW = DWBoundedbyCS()
+    Lambdas, vs = np.logspace(12, 15, 4), np.array([100., 246., 1e3, 1e4])
+    return lambda: defectGW.OmegaGWgridDWCS(Lambdas, vs, flist, range(1, kmax))
+
+def setup_snr():
+    from gaugedcs import CosmicString
+    import snrgeneric
+    Omega = CosmicString().OmegaGWspectrumCS(1e13, flist, range(1, 100))
+    return lambda: snrgeneric.snr_all_interferometers(flist, Omega)
+
+def setup_plot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import plotinterferometer
+    def plot():
+        fig = plt.figure()
+        plotinterferometer.plot_all_interferometers()
+        fig.canvas.draw()
+        plt.close(fig)
+    return plot
+
+BENCHMARKS = {
+    'OmegaGWcalcCS': setup_calcCS,
+    'OmegaGWcalcDWCS': setup_calcDWCS,
+    'OmegaGWcalcCS_numba': lambda: setup_calcCS('numba'),
+    'OmegaGWcalcDWCS_numba': lambda: setup_calcDWCS('numba'),
+    'spectrumCS_kmax2': lambda: setup_spectrumCS(2),
+    'spectrumCS_kmax10': lambda: setup_spectrumCS(10),
+    'spectrumCS_kmax100': lambda: setup_spectrumCS(100),
+    'spectrumDWCS_kmax2': lambda: setup_spectrumDWCS(2),
+    'spectrumDWCS_kmax5': lambda: setup_spectrumDWCS(5),
+    'resumDWCS_kmax100': lambda: setup_resumDWCS(100),
+    'resumDWCS_kmax1000': lambda: setup_resumDWCS(1000),
+    'gridDWCS_4x4_kmax2': lambda: setup_gridDWCS(2),
+    'gridDWCS_4x4_kmax5': lambda: setup_gridDWCS(5),
+    'snr_all_interferometers': setup_snr,
+    'plot_all_interferometers': setup_plot,
+}
+
+# median and minimum time in seconds of call over repeats, after a warm-up
+def time_call(call, repeats=5):
+    call()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': repeats}
+
+# run the benchmarks whose name contains one of the patterns (all by
+# default), with the startup and import times unless startup is False.
+# Benchmarks needing numba are skipped without it.
+def run_benchmarks(patterns=None, repeats=5, startup=True):
+    import loopkernels
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        if name.endswith('_numba') and not loopkernels.available:
+            continue
+        results[name] = time_call(setup(), repeats)
+    if not startup:
+        return {'meta': machine_info(), 'results': results}
+    import startupbench
+    if not patterns or any(pattern in 'startup' for pattern in patterns):
+        for class_name, times in startupbench.startup_times(repeats).items():
+            for stage in ('import', 'construct'):
+                results[f'startup_{class_name}_{stage}'] = {'median': times[stage], 'repeats': repeats}
+    if not patterns or any(pattern in 'import' for pattern in patterns):
+        for module, times in startupbench.import_times(repeats).items():
+            results[f'import_{module}'] = {'median': times['import'], 'repeats': repeats,
+                                           'side_effects': times['side_effects']}
+    return {'meta': machine_info(), 'results': results}
+
+# the environment the timings were taken in
+def machine_info():
+    import scipy
+    import matplotlib
+    import loopkernels
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'numpy': np.__version__, 'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__, 'numba': loopkernels.available}
+
+# compare the medians of the results with those of the baseline; returns
+# (name, baseline, current, ratio, status) for every benchmark, status being
+# 'regression', 'improvement', 'ok' or 'new'
+def compare(results, baseline, threshold=0.2):
+    rows = []
+    for name, current in results['results'].items():
+        if name not in baseline['results']:
+            rows.append((name, None, current['median'], None, 'new'))
+            continue
+        reference = baseline['results'][name]['median']
+        ratio = current['median'] / reference
+        status = 'regression' if ratio > 1 + threshold else 'improvement' if ratio < 1 / (1 + threshold) else 'ok'
+        rows.append((name, reference, current['median'], ratio, status))
+    return rows
+
+def write_json(path, data):
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+def read_json(path):
+    with open(path) as file:
+        return json.load(file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='benchmarks of the GW spectrum, SNR and plotting hot paths')
+    parser.add_argument('patterns', nargs='*', help='only run the benchmarks whose name contains one of these')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON file for the results')
+    parser.add_argument('--baseline', default=None, help='JSON file of earlier results to compare with')
+    parser.add_argument('--save-baseline', default=None, help='JSON file to store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slow-down of the median flagged as a regression')
+    parser.add_argument('--no-startup', action='store_true', help='skip the startup and import benchmarks')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.patterns, args.repeats, not args.no_startup)
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            write_json(path, results)
+    if args.baseline is None:
+        for name, timing in results['results'].items():
+            print(f"{name:40s} {1e3 * timing['median']:10.2f} ms")
+        sys.exit(0)
+    rows = compare(results, read_json(args.baseline), args.threshold)
+    for name, reference, current, ratio, status in rows:
+        reference = f'{1e3 * reference:10.2f} ms' if reference is not None else ' ' * 13
+        ratio = f'{ratio:6.2f}x' if ratio is not None else ' ' * 7
+        print(f'{name:40s} {reference} -> {1e3 * current:10.2f} ms {ratio}  {status}')
+    sys.exit(1 if any(row[4] == 'regression' for row in rows) else 0)
@@ -0,0 +1,321 @@
+"""
+This script is the command-line entry point for production runs. A run is
+described by a parameter file instead of constants edited in the scripts:
+
+    python cosmicstringgw.py scan run.json     calculate the spectra of the grid
+    python cosmicstringgw.py snr run.json      SNR of the spectra for all detectors
+    python cosmicstringgw.py plot run.json     one figure per spectrum
+
+The parameter file is JSON, e.g. for the scan of GWscanner.py over Lambda:
+
+    {
+        "defect": "DWBoundedbyCS",
+        "grid": {"Lambda": {"logspace": [12, 15, 4]}, "v": [246.0]},
+        "frequencies": {"logspace": [-9, 5, 30]},
+        "kmax": 10000,
+        "mode": "parallel",
+        "processes": null,
+        "kchunk": null,
+        "cache_path": null,
+        "adaptive": false,
+        "rtol": 0.01,
+        "store": "DWCSGW_store",
+        "snr": {"output": "DWCSGW_snr.csv"},
+        "plot": {"out_dir": "figures", "dpi": 150}
+    }
+
+The grid is the product of the values of its columns (Lambda, and v for
+DWBoundedbyCS); values are a number, a list or {"logspace": [start, stop,
+num]} / {"linspace": [start, stop, num]} as in numpy. The k-modes from 1 to
+kmax are summed. mode selects the engine of the scan:
+
+    parallel      every grid point over a pool of processes, see parallelscan.py
+    resum         the k-sum built from the fundamental mode, see kmodesum.py;
+                  batched over the v row of each Lambda for DWBoundedbyCS
+    direct        every mode in this process, batched: for CosmicString over
+                  the frequencies and modes, for DWBoundedbyCS over the whole
+                  row of v values of each Lambda (DWBoundedbyCS.OmegaGWgridDWCS)
+    distributed   the shards of distributedscan.py run by local workers,
+                  resumable from scan_dir; shards silent for stale_after
+                  seconds are taken over by the other workers
+
+The spectra are added to the spectrum store (see spectrumstore.py), which
+snr and plot read back. Grid points already in the store are not scanned
+again unless --force is given; snr and plot use the latest spectrum of
+every grid point. snr can instead read text files of two columns
+(frequency, Omega) listed under "snr": {"files": [...]}, as in snr2hdm.py.
+The options of the parameter file can be overridden on the command line,
+e.g. --processes 16 --kchunk 500 --cache OmegaGW_cache.sqlite. The cache
+must be on a local filesystem (SQLite does not work on NFS or Lustre); for
+distributed scans '{host}' in cache_path is replaced by the host name of
+each worker, see distributedscan.create_scan.
+
+"""
+import argparse
+import importlib
+import itertools
+import json
+import sys
+import numpy as np
+
+# defect classes with their module and the columns of their grid
+DEFECTS = {'CosmicString': ('gaugedcs', ('Lambda',)),
+           'DWBoundedbyCS': ('dwboundedbycs', ('Lambda', 'v'))}
+
+MODES = ('parallel', 'resum', 'direct', 'distributed')
+
+# default values of the options of a parameter file
+DEFAULTS = {'defect': 'DWBoundedbyCS', 'frequencies': {'logspace': [-9, 5, 30]}, 'kmax': 10000,
+            'mode': 'parallel', 'processes': None, 'kchunk': None, 'fchunk': None, 'cache_path': None,
+            'adaptive': False, 'rtol': 0.01, 'store': None, 'scan_dir': None, 'stale_after': 600.,
+            'force': False, 'snr': {}, 'plot': {}}
+
+# read the parameter file at path, with the defaults for missing options.
+# Raises ValueError for unknown options, defects and modes.
+def load_spec(path):
+    with open(path) as file:
+        spec = json.load(file)
+    unknown = set(spec) - set(DEFAULTS) - {'grid'}
+    if unknown:
+        raise ValueError(f'unknown options {sorted(unknown)} in {path}')
+    spec = dict(DEFAULTS, **spec)
+    if spec['defect'] not in DEFECTS:
+        raise ValueError(f"unknown defect {spec['defect']}, choose from {list(DEFECTS)}")
+    if spec['mode'] not in MODES:
+        raise ValueError(f"unknown mode {spec['mode']}, choose from {list(MODES)}")
+    if spec['store'] is None:
+        spec['store'] = 'DWCSGW_store' if spec['defect'] == 'DWBoundedbyCS' else 'CSGW_store'
+    return spec
+
+# the values of a grid column or of the frequencies: a number, a list, or
+# {"logspace": [start, stop, num]} or {"linspace": [start, stop, num]}
+def values(entry):
+    if isinstance(entry, dict):
+        (kind, args), = entry.items()
+        if kind not in ('logspace', 'linspace'):
+            raise ValueError(f'unknown spacing {kind}, choose logspace or linspace')
+        return [float(x) for x in getattr(np, kind)(args[0], args[1], int(args[2]))]
+    return [float(x) for x in np.atleast_1d(entry)]
+
+# the parameter tuples of the grid, in the order of the columns of the defect
+def grid_points(spec):
+    columns = DEFECTS[spec['defect']][1]
+    grid = spec.get('grid', {})
+    if set(grid) != set(columns):
+        raise ValueError(f"the grid of {spec['defect']} needs the columns {list(columns)}, got {list(grid)}")
+    return list(itertools.product(*[values(grid[col]) for col in columns]))
+
+def defect_class(spec):
+    module, _ = DEFECTS[spec['defect']]
+    return getattr(importlib.import_module(module), spec['defect'])
+
+def make_defect(spec):
+    defect = defect_class(spec)()
+    if spec['cache_path'] is not None:
+        defect.use_cache(spec['cache_path'])
+    return defect
+
+# the function flist -> Omega at the grid point params for the engine of
+# mode parallel, resum or direct. The workers of the parallel mode get
+# copies of defect, with its settings and cache.
+def spectrum_function(spec, defect, params):
+    import parallelscan
+    import snrpipeline
+    kmax = spec['kmax']
+    _, single_method = snrpipeline.METHODS[spec['defect']]
+    if spec['mode'] == 'parallel':
+        return lambda flist: parallelscan.evaluate_parallel(defect, single_method, params, flist,
+                                                            range(1, kmax + 1), processes=spec['processes'],
+                                                            kchunk=spec['kchunk'])
+    resum = spec['mode'] == 'resum'
+    return lambda flist: next(snrpipeline.spectra(defect, [params], flist, kmax, resum))[1]
+
+# calculate the spectra of the grid points that are not in the store yet
+# (all of them if spec['force'] is set) and add them to the store; returns
+# the number of spectra written
+def scan(spec):
+    import adaptivegrid
+    import spectrumstore
+    grid = grid_points(spec)
+    flist = np.array(values(spec['frequencies']))
+    columns = DEFECTS[spec['defect']][1]
+    store = spectrumstore.SpectrumStore(spec['store'], columns)
+    missing = grid if spec['force'] else [params for params in grid if not in_store(store, params)]
+    if not missing:
+        return 0
+    if spec['mode'] == 'distributed':
+        if spec['adaptive']:
+            raise ValueError('adaptive frequencies are not available in the distributed mode')
+        # the scan in scan_dir covers the whole grid, so that it can be resumed
+        spectra = distributed_spectra(spec, grid, flist)
+        with store:
+            for params, Omega in zip(grid, spectra):
+                if params in missing:
+                    store.append(params, flist, Omega)
+        return len(missing)
+    defect = make_defect(spec) if spec['mode'] != 'parallel' else None
+    if spec['defect'] == 'DWBoundedbyCS' and spec['mode'] in ('direct', 'resum') and not spec['adaptive']:
+        return scan_rows(spec, defect, flist, store, missing)
+    with store:
+        for params in missing:
+            spectrum = spectrum_function(spec, defect, params)
+            if spec['adaptive']:
+                fl, Omega = adaptivegrid.adaptive_spectrum(spectrum, flist[0], flist[-1], spec['rtol'])
+            else:
+                fl, Omega = flist, spectrum(flist)
+            store.append(params, fl, Omega)
+            # every spectrum is kept as soon as it is finished
+            store.flush()
+            print(dict(zip(columns, params)), 'done', flush=True)
+    return len(missing)
+
+# True if the store holds a spectrum of the grid point params
+def in_store(store, params):
+    return len(store.select(**dict(zip(store.columns, params)))) > 0
+
+# the DWBoundedbyCS spectra of the (Lambda, v) points in missing one Lambda
+# at a time, all its v values in one batch that shares the work between
+# them; every row is added to store as soon as it is finished. Returns the
+# number of spectra written.
+def scan_rows(spec, defect, flist, store, missing):
+    Lambdas = list(dict.fromkeys(Lambda for Lambda, _ in missing))
+    with store:
+        for Lambda in Lambdas:
+            vs = [v for L, v in missing if L == Lambda]
+            if spec['mode'] == 'resum':
+                row = defect.OmegaGWresumgridDWCS([Lambda], vs, flist, spec['kmax'])[0]
+            else:
+                row = defect.OmegaGWgridDWCS([Lambda], vs, flist, range(1, spec['kmax'] + 1))[0]
+            for v, Omega in zip(vs, row):
+                store.append((Lambda, v), flist, Omega)
+            store.flush()
+            print({'Lambda': Lambda, 'v': vs}, 'done', flush=True)
+    return len(missing)
+
+# the spectra of the grid from the shards of a distributed scan in
+# scan_dir, run by processes local workers. Calling it again resumes the
+# scan, see distributedscan.py.
+def distributed_spectra(spec, grid, flist):
+    import distributedscan
+    if spec['scan_dir'] is None:
+        raise ValueError('the distributed mode needs a scan_dir')
+    kchunk = spec['kchunk'] if spec['kchunk'] is not None else 1000
+    distributedscan.create_scan(spec['scan_dir'], spec['defect'], grid, flist, range(1, spec['kmax'] + 1),
+                                spec['fchunk'], kchunk, spec['cache_path'])
+    return distributedscan.run_local(spec['scan_dir'], spec['processes'], spec['stale_after'])
+
+# rows of the store holding the spectra of the grid points, or of all
+# parameter sets if the parameter file has no grid. A point scanned more
+# than once (see --force) is represented by its latest row.
+def store_rows(store, spec):
+    if 'grid' not in spec:
+        _, first = np.unique(store.params[::-1], axis=0, return_index=True)
+        return np.sort(len(store) - 1 - first)
+    rows = [store.select(**dict(zip(store.columns, params))) for params in grid_points(spec)]
+    return np.unique([r[-1] for r in rows if len(r)]).astype(int)
+
+# stream of (params, Omega, snr) of the rows of the store. Spectra sharing
+# their frequencies are evaluated in batches, see snrpipeline.snr_stream;
+# spectra on adaptive grids one by one.
+def store_snr(store, rows, names=None):
+    import snrpipeline
+    import snrgeneric
+    try:
+        _, flist, _ = store.load(rows)
+    except ValueError:
+        for i in rows:
+            params, f, Omega = store.spectrum(i)
+            yield tuple(params), Omega, snrgeneric.snr_matrix(f, Omega, names)[0]
+        return
+    yield from snrpipeline.snr_stream(store.stream(rows), flist, names)
+
+# SNR of the spectra of the parameter file for all detectors (or those
+# listed under "snr": {"detectors": [...]}); written as csv to the output of
+# the "snr" options, or printed. Returns the number of spectra.
+def snr(spec):
+    import detectors
+    import snrpipeline
+    import spectrumstore
+    options = spec['snr']
+    names = options.get('detectors')
+    output = options.get('output')
+    if 'files' in options:
+        return snr_files(options['files'], output, names)
+    store = spectrumstore.SpectrumStore(spec['store'], DEFECTS[spec['defect']][1])
+    stream = store_snr(store, store_rows(store, spec), names)
+    if output is not None:
+        return snrpipeline.write_snr_csv(stream, output, store.columns, names)
+    count = 0
+    for params, _, row in stream:
+        print(dict(zip(store.columns, map(float, params))),
+              {name: round(float(value), 2) for name, value in zip(names or detectors.snr_names, row)})
+        count += 1
+    return count
+
+# SNR of the spectra in text files of two columns (frequency, Omega), one
+# line per file, written as csv to output or printed. Zero amplitudes are
+# left out, as in snr2hdm.py.
+def snr_files(files, output=None, names=None):
+    import detectors
+    import snrgeneric
+    names = detectors.snr_names if names is None else names
+    lines = [','.join(['file'] + ['snr_' + name for name in names])]
+    for path in files:
+        data = np.loadtxt(path)
+        nonzero = np.nonzero(data[:, 1])
+        row = snrgeneric.snr_matrix(data[:, 0][nonzero], data[:, 1][nonzero], names)[0]
+        lines.append(','.join([path] + [repr(float(x)) for x in row]))
+    if output is None:
+        print('\n'.join(lines))
+    else:
+        with open(output, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+    return len(files)
+
+# one figure per spectrum of the parameter file in the out_dir of the "plot"
+# options, see batchplot.store_figures; returns the paths written
+def plot(spec):
+    import batchplot
+    import spectrumstore
+    options = dict(spec['plot'])
+    out_dir = options.pop('out_dir', 'figures')
+    style = options.pop('style', None)
+    store = spectrumstore.SpectrumStore(spec['store'], DEFECTS[spec['defect']][1])
+    return batchplot.store_figures(spec['store'], out_dir, list(store_rows(store, spec)), style,
+                                   spec['processes'], **options)
+
+COMMANDS = {'scan': scan, 'snr': snr, 'plot': plot}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='scans, SNR and plots of GW spectra from cosmic string defects')
+    parser.add_argument('command', choices=list(COMMANDS))
+    parser.add_argument('spec', help='JSON parameter file of the run')
+    parser.add_argument('--mode', choices=MODES, default=None, help='engine of the scan')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--kchunk', type=int, default=None, help='k-modes per work unit or shard')
+    parser.add_argument('--cache', dest='cache_path', default=None, help='sqlite cache of (f, k) cells')
+    parser.add_argument('--store', default=None, help='spectrum store, see spectrumstore.py')
+    parser.add_argument('--scan-dir', dest='scan_dir', default=None, help='directory of a distributed scan')
+    parser.add_argument('--stale-after', dest='stale_after', type=float, default=None,
+                        help='seconds after which a silent shard of a distributed scan is requeued')
+    parser.add_argument('--force', action='store_true', default=None,
+                        help='scan the grid points that are already in the store again')
+    parser.add_argument('--output', default=None, help='csv file for snr')
+    parser.add_argument('--out-dir', dest='out_dir', default=None, help='directory of the figures for plot')
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    for key in ('mode', 'processes', 'kchunk', 'cache_path', 'store', 'scan_dir', 'stale_after', 'force'):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    if args.output is not None:
+        spec['snr'] = dict(spec['snr'], output=args.output)
+    if args.out_dir is not None:
+        spec['plot'] = dict(spec['plot'], out_dir=args.out_dir)
+    result = COMMANDS[args.command](spec)
+    if args.command == 'plot':
+        print(f'wrote {len(result)} figures')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+This script provides the cosmological background shared by the defect
+classes: the scale factor a(t) as a function of time in GeV^-1.
+
+By default a(t) is read from a precomputed table such as
+a_evolution_in_Standard_cosmology.dat. The text table is parsed only once.
+Its contents are stored next to it in a binary .npy file, which later
+processes load as a memory-mapped array, and within a process every defect
+object shares the same table.
+
+For non-standard expansion histories (early matter domination, kination,
+varying g*, ...) expansion_history solves for a(t) from a user-supplied
+Hubble rate H(a) and caches the solution by its parameters, in memory and
+on disk. The result can be passed to CosmicString and DWBoundedbyCS in place
+of the standard table.
+
+Since t spans about 40 decades, the lookup interpolates linearly in
+log t - log a, and the table bin of each t is located in O(1) through an
+index over a uniform grid in log t.
+
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import numpy as np
+import scipy.integrate as spi
+import atomicfiles
+
+# backgrounds already loaded or solved in this process
+loaded_tables = {}
+
+# read the table at path as a memory-mapped (n, 2) array, converting the text
+# file to a binary .npy file next to it the first time
+def load_table(path):
+    npy_path = path + '.npy'
+    if not os.path.exists(npy_path) or os.path.getmtime(npy_path) < os.path.getmtime(path):
+        data = np.loadtxt(path)
+        if not atomicfiles.try_save_array(npy_path, data):
+            # read-only data directory, keep the parsed table in memory only
+            return data
+    return np.load(npy_path, mmap_mode='r')
+
+class ScaleFactor:
+    # data is an (n, 2) array of t and a(t); source = (function, args) is
+    # what recreates this object in another process
+    def __init__(self, data, source, cells_per_knot=64):
+        self.data = data
+        self.source = source
+        self.t = self.data[:, 0]
+        self.a = self.data[:, 1]
+        self.logt = np.log(self.t)
+        self.loga = np.log(self.a)
+        self.slope = np.diff(self.loga) / np.diff(self.logt)
+        # uniform grid in log t with cells_per_knot cells per table point on
+        # average; cell_knot[c] is the table bin containing the left edge of
+        # cell c, and no cell contains more than max_advance table points
+        self.ncells = cells_per_knot * len(self.t)
+        self.cell_width = (self.logt[-1] - self.logt[0]) / self.ncells
+        edges = self.logt[0] + self.cell_width * np.arange(self.ncells + 1)
+        knots = np.searchsorted(self.logt, edges, side='right') - 1
+        self.cell_knot = np.clip(knots[:-1], 0, len(self.t) - 2)
+        self.max_advance = int(np.max(knots[1:] - knots[:-1]))
+        # log t of the next table point, never passed beyond the last bin
+        self.logt_next = np.append(self.logt[1:-1], np.inf)
+    
+    # the table is reloaded from its source, which is cheap thanks to the caches
+    def __reduce__(self):
+        return self.source
+    
+    # index of the table bin containing each log t
+    def locate(self, logt):
+        if np.ndim(logt) == 0:
+            if not self.logt[0] <= logt <= self.logt[-1]:
+                raise ValueError('A value in t is outside the range of the scale factor table.')
+        elif logt.size and (logt.min() < self.logt[0] or logt.max() > self.logt[-1]):
+            raise ValueError('A value in t is outside the range of the scale factor table.')
+        u = (logt - self.logt[0]) / self.cell_width
+        knot = self.cell_knot[np.minimum(u.astype(int), self.ncells - 1)]
+        for _ in range(self.max_advance):
+            knot += self.logt_next[knot] <= logt
+        return knot
+    
+    # scale factor at the times t (scalar or array)
+    def __call__(self, t):
+        logt = np.log(t)
+        knot = self.locate(logt)
+        return np.exp(self.loga[knot] + self.slope[knot] * (logt - self.logt[knot]))
+    
+    # time at which the scale factor equals a
+    def time_of(self, a):
+        return np.clip(np.exp(np.interp(np.log(a), self.loga, self.logt)), self.t[0], self.t[-1])
+    
+    # equation of state w of the expansion at the times t, from a ~ t^(2/(3(1+w)))
+    def eos(self, t):
+        return 2. / (3 * self.slope[self.locate(np.log(t))]) - 1
+
+# scale factor from the table at path, shared by all the objects of a process
+def scale_factor(path="a_evolution_in_Standard_cosmology.dat"):
+    path = os.path.abspath(path)
+    if path not in loaded_tables:
+        loaded_tables[path] = ScaleFactor(load_table(path), (scale_factor, (path,)))
+    return loaded_tables[path]
+
+GeVperH0 = 2.1332e-42 # H0 = 100 km/s/Mpc in GeV
+
+# Hubble rate in GeV for a universe made of components with constant equation
+# of state, H = H0 sqrt(sum_i Omega_i a^(-3 (1 + w_i))) with a = 1 today.
+# components is a list of (Omega_i, w_i); the default is radiation, matter and
+# a cosmological constant. Kination, for example, is an extra (Omega, 1.).
+def hubble_components(a, h=0.679, components=((9.0e-5, 1./3), (0.31, 0.), (0.69991, -1.))):
+    rho = sum(Omega * a ** (-3 * (1 + w)) for Omega, w in components)
+    return GeVperH0 * h * np.sqrt(rho)
+
+# solve dt/d(ln a) = 1/H(a) from a_min to a_max for the Hubble rate
+# hubble(a, **params) in GeV, and return the scale factor a(t) on npoints
+# values of a. At a_min the universe is taken to expand as a power law,
+# t = 1/(n H) with n = -d ln H / d ln a. Solutions are cached by their
+# parameters, in memory and as .npy files in cache_dir (None to disable).
+def expansion_history(hubble, a_min=1e-32, a_max=1., npoints=3000, cache_dir='background_cache', **params):
+    try:
+        code = inspect.getsource(hubble)
+    except (OSError, TypeError):
+        code = ''
+    description = json.dumps([f'{hubble.__module__}.{hubble.__qualname__}', code,
+                              float(a_min), float(a_max), int(npoints), params], sort_keys=True, default=repr)
+    key = hashlib.sha256(description.encode()).hexdigest()[:32]
+    if key in loaded_tables:
+        return loaded_tables[key]
+    source = (functools.partial(expansion_history, hubble, **params), (a_min, a_max, npoints, cache_dir))
+    npy_path = None if cache_dir is None else os.path.join(cache_dir, f'a_evolution_{key}.npy')
+    if npy_path is not None and os.path.exists(npy_path):
+        data = np.load(npy_path, mmap_mode='r')
+    else:
+        data = solve_expansion(hubble, a_min, a_max, npoints, params)
+        if npy_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            atomicfiles.try_save_array(npy_path, data)
+    loaded_tables[key] = ScaleFactor(data, source)
+    return loaded_tables[key]
+
+def solve_expansion(hubble, a_min, a_max, npoints, params):
+    lna = np.linspace(np.log(a_min), np.log(a_max), npoints)
+    H = lambda x: hubble(np.exp(x), **params)
+    dx = 1e-4
+    n = -(np.log(H(lna[0] + dx)) - np.log(H(lna[0]))) / dx
+    t_start = 1 / (n * H(lna[0]))
+    solution = spi.solve_ivp(lambda x, t: 1 / H(x), (lna[0], lna[-1]), [t_start],
+                             method='DOP853', t_eval=lna, rtol=1e-10, atol=0)
+    if not solution.success:
+        raise RuntimeError(f'expansion history could not be solved: {solution.message}')
+    return np.column_stack((solution.y[0], np.exp(lna)))
@@ -0,0 +1,137 @@
+"""
+This script is the registry of the interferometer and pulsar timing data in
+the folder 'Interferometer data'. Every entry declares the data file, the
+h^2 rescaling of the curve, how the SNR is calculated (if at all) and how the
+curve is drawn. The SNR calculation in snrgeneric.py and the plots in
+plotinterferometer.py look the detectors up here.
+
+Each curve is read only once per process, when it is first needed. The
+parsed curve is stored next to the .csv file as a binary .npy file, which
+later processes load instead of parsing the text again.
+
+"""
+import os
+import numpy as np
+import atomicfiles
+
+# Get the current working directory
+current_dir = os.getcwd()
+
+# Define the name of the folder containing the data
+folder_name = 'Interferometer data'
+
+# the detectors. Each entry has
+#   file:    data file inside folder_name, columns f and Omega_GW
+#   h2:      factor multiplying the Omega_GW column, e.g. 0.7**2 for h = 0.7
+#   snr:     'integrated' over the sensitivity curve, 'summed' over the
+#            frequency bins of the data, or None if no SNR is calculated
+#   line:    keyword arguments of plt.loglog for the curve, None for no line
+#   fill_to: the region filled, up to this Omega_GW above the curve, up to
+#            the maximum of the curve ('max') or the closed curve itself
+#            ('polygon'); None for no fill
+#   fill:    keyword arguments of the fill
+#   labels:  (x, y, text, keyword arguments of plt.text)
+registry = {
+    'MuARES': dict(file='MuARES.csv', h2=1., snr='integrated',
+                   line=dict(linestyle='--', color='darkgreen', alpha=0.5, linewidth=1),
+                   fill_to='max', fill=dict(color='lightgreen', alpha=0.2),
+                   labels=[(1e-4, 1.5e-16, r'$\mu$Ares', dict(color='green', fontsize=7))]),
+    'LISA': dict(file='LISApoints.csv', h2=1., snr='integrated',
+                 line=dict(linestyle='--', color='blue', alpha=0.3, linewidth=1),
+                 fill_to=10, fill=dict(color='skyblue', alpha=0.5),
+                 labels=[(4.3e-5, 5.5e-11, r'LISA', dict(color='blue', fontsize=7, rotation=-64))]),
+    'BBO': dict(file='BBO.csv', h2=1., snr='integrated',
+                line=dict(linestyle='--', color='darkgreen', alpha=0.3, linewidth=1),
+                fill_to=10, fill=dict(color='limegreen', alpha=0.2),
+                labels=[(0.08, 15.5e-18, r'BBO', dict(color='darkgreen', fontsize=7))]),
+    'DECIGO': dict(file='Decigo.csv', h2=1., snr='integrated',
+                   line=dict(linestyle='--', color='blue', alpha=0.3, linewidth=1),
+                   fill_to=10, fill=dict(color='lightblue', alpha=0.5),
+                   labels=[(0.03, 12.5e-17, r'DECIGO', dict(color='blue', fontsize=7))]),
+    'AION': dict(file='AION.csv', h2=1., snr='integrated',
+                 line=dict(linestyle='--', color='blue', alpha=0.4, linewidth=1),
+                 fill_to='max', fill=dict(color='lightblue', alpha=0.7),
+                 labels=[(0.22, 1.0e-11, r'AION', dict(color='blue', fontsize=7, rotation=68))]),
+    'AEDGE': dict(file='AEDGE.csv', h2=1., snr='integrated',
+                  line=dict(linestyle='--', color='green', alpha=0.8, linewidth=1),
+                  fill_to='max', fill=dict(color='lightgreen', alpha=0.5),
+                  labels=[(0.08, 1.0e-13, r'AEDGE', dict(color='green', fontsize=7, rotation=58))]),
+    'ET': dict(file='ETlist.csv', h2=1., snr='integrated',
+               line=dict(linestyle='--', color='darkgreen', alpha=0.7, linewidth=1),
+               fill_to=10, fill=dict(color='lightgreen', alpha=0.5),
+               labels=[(2.3, 12.5e-12, r'ET', dict(color='darkgreen', fontsize=7, rotation=-75))]),
+    'CE': dict(file='CE.csv', h2=1., snr='integrated',
+               line=dict(linestyle='--', color='blue', alpha=0.6, linewidth=1),
+               fill_to='max', fill=dict(color='lightblue', alpha=0.5),
+               labels=[(65, 19.5e-12, r'CE', dict(color='blue', fontsize=7, rotation=65))]),
+    'Aplus': dict(file='Aplusdesignsensitivity.csv', h2=0.7**2, snr='summed',
+                  line=dict(linestyle='--', linewidth=1, color='blue', alpha=0.5),
+                  fill_to='max', fill=dict(color='lightblue', alpha=0.5),
+                  labels=[(18, 4.5e-10, r'A+', dict(color='blue', fontsize=7))]),
+    'HLV': dict(file='LIGOVIRGOdesignsensitivity.csv', h2=0.7**2, snr='summed',
+                line=dict(linestyle='--', linewidth=1, color='green', alpha=0.5),
+                fill_to='max', fill=dict(color='lightgreen', alpha=0.5),
+                labels=[(15, 2.5e-9, r'HLV', dict(color='darkgreen', fontsize=7))]),
+    'ALIGOVIRGO': dict(file='LIGOsensitivity.csv', h2=0.7**2, snr=None,
+                       line=dict(linestyle='-', color='gray', alpha=0.8, linewidth=1),
+                       fill_to='max', fill=dict(color='gray', alpha=0.5),
+                       labels=[(25, 4.0e-8, r'LVK', dict(color='black', fontsize=7)),
+                               (25, 2.0e-8, r'(O3)', dict(color='black', fontsize=7))]),
+    'SKA': dict(file='SKA.csv', h2=1., snr=None,
+                line=dict(linestyle='--', color='darkgreen', alpha=0.5, linewidth=1),
+                fill_to=10, fill=dict(color='lightgreen', alpha=0.3),
+                labels=[(2.0e-9, 2.5e-15, r'SKA', dict(color='darkgreen', fontsize=7, rotation=69))]),
+    # the first EPTA bin only carries the label
+    'EPTAbin00': dict(file='EPTAbin00.csv', h2=1., snr=None,
+                      line=dict(linestyle='-', color='orange', alpha=0.2),
+                      fill_to=None, fill=None,
+                      labels=[(3.3e-9, 1e-8, r'EPTA', dict(color='darkorange', fontsize=7, rotation=55))]),
+}
+
+# NANOGrav 15 data is divided into bins, each a closed contour
+for i in range(1, 31):
+    registry[f'NGbin{i}'] = dict(file=f'NGbin{i}.csv', h2=1., snr=None,
+                                 line=dict(linestyle='-', color='blue', alpha=0.1),
+                                 fill_to='polygon', fill=dict(color='lightblue', alpha=0.5),
+                                 labels=[(2.3e-9, 1.5e-9, r'NG15', dict(color='blue', fontsize=7, rotation=55))] if i == 1 else [])
+
+# the remaining EPTA bins
+for i in range(8):
+    registry[f'EPTAbin{i}'] = dict(file=f'EPTAbin{i}.csv', h2=1., snr=None,
+                                   line=dict(linestyle='-', color='orange', alpha=0.2),
+                                   fill_to='max', fill=dict(color='orange', alpha=0.1),
+                                   labels=[])
+
+# the detectors with an SNR, in the order of snrgeneric.snr_all_interferometers
+snr_names = [name for name, entry in registry.items() if entry['snr'] is not None]
+
+# detectors already loaded in this process
+loaded = {}
+
+class Detector:
+    # f and Omega are the frequencies and the rescaled Omega_GW of the curve
+    def __init__(self, name, data):
+        self.name = name
+        self.entry = registry[name]
+        self.f = data[:, 0]
+        self.Omega = self.entry['h2'] * data[:, 1]
+        self.logf = np.log10(self.f)
+        self.logOmega = np.log10(self.Omega)
+
+# the detector called name, see registry
+def detector(name):
+    if name not in loaded:
+        path = os.path.join(current_dir, folder_name, registry[name]['file'])
+        loaded[name] = Detector(name, load_curve(path))
+    return loaded[name]
+
+# read the csv file at path as an (n, 2) array, converting it to a binary
+# .npy file next to it the first time
+def load_curve(path):
+    npy_path = path + '.npy'
+    if not os.path.exists(npy_path) or os.path.getmtime(npy_path) < os.path.getmtime(path):
+        data = np.genfromtxt(path, delimiter=',')
+        if not atomicfiles.try_save_array(npy_path, data):
+            # read-only data directory, keep the parsed curve in memory only
+            return data
+    return np.load(npy_path)
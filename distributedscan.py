@@ -0,0 +1,268 @@
+"""
+This script drives long scans of GW spectra over a grid of model parameters
+on several nodes of a cluster, with checkpointing and resuming.
+
+The work space (parameter grid x frequencies x k-modes) is split into shards
+that are kept as small files in a scan directory on a shared filesystem:
+
+    scan_dir/scan.json       description of the scan
+    scan_dir/pending/        shards waiting to be calculated
+    scan_dir/running/        shards claimed by a worker
+    scan_dir/done/           partial k-sums of the finished shards (.npy)
+
+A worker claims a shard by atomically renaming it from pending/ to running/,
+so that every shard is calculated by exactly one worker, and marks it with
+its host and process id; it writes its result to done/ when it is finished
+and removes the running shard only if it still holds that claim. Workers refresh the modification time
+of their running shards while they calculate them; shards whose worker has
+been silent for longer than stale_after seconds (e.g. because its node was
+lost) are moved back to pending/ and picked up by the other workers.
+Restarting an interrupted scan therefore only calculates the shards that
+have not been finished yet.
+
+Usage on a cluster, with scan_dir on the shared filesystem:
+
+    create the scan once with create_scan(...)
+    python distributedscan.py worker scan_dir    (on every node)
+    python distributedscan.py collect scan_dir   (when all shards are done)
+
+On a single machine run_local(scan_dir, nworkers) starts several local
+worker processes standing in for the nodes.
+
+A result cache must be node-local: SQLite does not work on network
+filesystems, see create_scan.
+
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+import numpy as np
+import atomicfiles
+import parallelscan
+import spectrumstore
+
+# defect classes that can be scanned, with their single-mode methods
+DEFECTS = {'CosmicString': ('gaugedcs', 'OmegaGWcalcCS'),
+           'DWBoundedbyCS': ('dwboundedbycs', 'OmegaGWcalcDWCS')}
+
+def shard_name(p, fstart, kstart):
+    return f'shard_{p:06d}_{fstart:06d}_{kstart:09d}.json'
+
+# create the scan directory and its shards. grid is a list of parameter
+# tuples passed before the frequency to the single-mode method of the defect,
+# e.g. [(Lambda, v), ...] for DWBoundedbyCS or [(Lambda,), ...] for
+# CosmicString. If the scan already exists with the same description it is
+# left as it is, so that calling create_scan again resumes it.
+# cache_path is opened by every worker, and the SQLite cache (see
+# resultcache.py) does not work on network filesystems such as NFS or
+# Lustre, so it must be on a filesystem local to each node; '{host}' in it
+# is replaced by the host name of the worker, e.g. '/tmp/OmegaGW_{host}.sqlite'.
+def create_scan(scan_dir, defect, grid, flist, klist, fchunk=None, kchunk=1000, cache_path=None):
+    spec = {'defect': defect,
+            'grid': [[float(x) for x in params] for params in grid],
+            'flist': [float(freq) for freq in flist],
+            'klist': [int(k) for k in klist],
+            'cache_path': cache_path}
+    spec_path = os.path.join(scan_dir, 'scan.json')
+    if os.path.exists(spec_path):
+        if load_spec(scan_dir) != spec:
+            raise ValueError(f'{scan_dir} already holds a different scan')
+        return spec
+    if defect not in DEFECTS:
+        raise ValueError(f'unknown defect {defect}, choose from {list(DEFECTS)}')
+    for sub in ('pending', 'running', 'done'):
+        os.makedirs(os.path.join(scan_dir, sub), exist_ok=True)
+    nf, nk = len(spec['flist']), len(spec['klist'])
+    fchunk = nf if fchunk is None else fchunk
+    for p in range(len(spec['grid'])):
+        for fstart in range(0, nf, fchunk):
+            for kstart in range(0, nk, kchunk):
+                shard = {'p': p, 'f': [fstart, min(fstart + fchunk, nf)],
+                         'k': [kstart, min(kstart + kchunk, nk)]}
+                write_json(os.path.join(scan_dir, 'pending', shard_name(p, fstart, kstart)), shard)
+    # the description is written last, an incomplete scan is never resumed
+    write_json(spec_path, spec)
+    return spec
+
+def write_json(path, data):
+    tmp_path = f'{path}.{socket.gethostname()}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+def load_spec(scan_dir):
+    with open(os.path.join(scan_dir, 'scan.json')) as file:
+        return json.load(file)
+
+# host and process id of this worker, marking the shards it claimed
+def worker_id():
+    return f'{socket.gethostname()}.{os.getpid()}'
+
+# claim a pending shard by moving it to running/ and marking it with the
+# worker id, return its name or None
+def claim_shard(scan_dir):
+    pending = sorted(name for name in os.listdir(os.path.join(scan_dir, 'pending'))
+                     if name.endswith('.json'))
+    for name in pending:
+        running_path = os.path.join(scan_dir, 'running', name)
+        try:
+            os.rename(os.path.join(scan_dir, 'pending', name), running_path)
+            with open(running_path) as file:
+                shard = json.load(file)
+        except FileNotFoundError:
+            continue # claimed by another worker in the meantime
+        write_json(running_path, dict(shard, owner=worker_id()))
+        return name
+    return None
+
+# True if the running shard name is claimed by this worker
+def owns_shard(scan_dir, name):
+    try:
+        with open(os.path.join(scan_dir, 'running', name)) as file:
+            return json.load(file).get('owner') == worker_id()
+    except FileNotFoundError:
+        return False
+
+# move the running shards that have not been refreshed for stale_after seconds
+# back to pending/, return how many were moved
+def requeue_stale(scan_dir, stale_after=600.):
+    moved = 0
+    now = time.time()
+    for name in os.listdir(os.path.join(scan_dir, 'running')):
+        path = os.path.join(scan_dir, 'running', name)
+        try:
+            if now - os.path.getmtime(path) > stale_after:
+                os.rename(path, os.path.join(scan_dir, 'pending', name))
+                moved += 1
+        except FileNotFoundError:
+            continue # finished or requeued by another worker in the meantime
+    return moved
+
+# calculate one shard, refreshing its running file after every k-mode
+def run_shard(scan_dir, spec, defect, method, name):
+    running_path = os.path.join(scan_dir, 'running', name)
+    with open(running_path) as file:
+        shard = json.load(file)
+    params = spec['grid'][shard['p']]
+    flist = spec['flist'][shard['f'][0]:shard['f'][1]]
+    klist = spec['klist'][shard['k'][0]:shard['k'][1]]
+    calc = getattr(defect, method)
+    # k-modes that cannot contribute at a frequency are skipped
+    kmax = parallelscan.contributing_kmax(defect, method, params, flist, max(klist))
+    result = np.zeros(len(flist))
+    for k in klist:
+        for i, freq in enumerate(flist):
+            if k <= kmax[i]:
+                result[i] += calc(*params, freq, k)
+        try:
+            os.utime(running_path)
+        except FileNotFoundError:
+            pass # requeued as stale, the result is still valid
+    done_path = os.path.join(scan_dir, 'done', name[:-len('.json')] + '.npy')
+    atomicfiles.save_array(done_path, result)
+    # a shard requeued while this worker was slow may have been claimed by
+    # another worker, whose claim is left to it
+    paths = [running_path] if owns_shard(scan_dir, name) else []
+    for path in paths + [os.path.join(scan_dir, 'pending', name)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# worker loop: claim and calculate shards until none are left. Shards of
+# lost workers are picked up once they have been silent for stale_after
+# seconds; while other shards are still running, the worker checks again
+# every poll seconds instead of exiting, so that it can take over the shards
+# of a node lost after all other workers ran out of pending shards.
+def run_worker(scan_dir, stale_after=600., poll=10.):
+    spec = load_spec(scan_dir)
+    module, method = DEFECTS[spec['defect']]
+    defect = getattr(importlib.import_module(module), spec['defect'])()
+    if spec['cache_path'] is not None:
+        defect.use_cache(spec['cache_path'].format(host=socket.gethostname()))
+    finished = 0
+    while True:
+        name = claim_shard(scan_dir)
+        if name is None:
+            if requeue_stale(scan_dir, stale_after) > 0:
+                continue
+            if status(scan_dir)['running'] == 0:
+                return finished
+            time.sleep(poll)
+            continue
+        if os.path.exists(os.path.join(scan_dir, 'done', name[:-len('.json')] + '.npy')):
+            # finished by a worker that was wrongly considered lost
+            os.remove(os.path.join(scan_dir, 'running', name))
+            continue
+        run_shard(scan_dir, spec, defect, method, name)
+        finished += 1
+
+# run nworkers local worker processes standing in for the nodes of a cluster;
+# workers without a shard check every poll seconds for the others to finish
+def run_local(scan_dir, nworkers=None, stale_after=600., poll=1.):
+    if nworkers is None:
+        nworkers = os.cpu_count()
+    # no other workers run on the scan, so the running shards were left by an
+    # interrupted run and are all requeued
+    requeue_stale(scan_dir, stale_after=-np.inf)
+    workers = [multiprocessing.Process(target=run_worker, args=(scan_dir, stale_after, poll))
+               for _ in range(nworkers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return collect(scan_dir)
+
+# number of pending, running and finished shards
+def status(scan_dir):
+    return {sub: len([name for name in os.listdir(os.path.join(scan_dir, sub))
+                      if name.endswith('.json' if sub != 'done' else '.npy')])
+            for sub in ('pending', 'running', 'done')}
+
+# add up the finished shards into the spectra, an array of shape
+# (len(grid), len(flist)). Raises an error if shards are still missing.
+def collect(scan_dir):
+    spec = load_spec(scan_dir)
+    counts = status(scan_dir)
+    if counts['pending'] or counts['running']:
+        raise RuntimeError(f'scan {scan_dir} is not finished: {counts}')
+    spectra = np.zeros((len(spec['grid']), len(spec['flist'])))
+    for name in os.listdir(os.path.join(scan_dir, 'done')):
+        if not name.endswith('.npy'):
+            continue
+        p, fstart = (int(x) for x in name[len('shard_'):-len('.npy')].split('_')[:2])
+        partial = np.load(os.path.join(scan_dir, 'done', name))
+        spectra[p, fstart:fstart + len(partial)] += partial
+    return spectra
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='worker and collector of distributed GW spectrum scans')
+    parser.add_argument('command', choices=['worker', 'status', 'collect'])
+    parser.add_argument('scan_dir')
+    parser.add_argument('--stale-after', type=float, default=600.,
+                        help='seconds after which a silent running shard is requeued')
+    parser.add_argument('--output', default=None,
+                        help='text file for collect, with the frequencies in the first column')
+    parser.add_argument('--store', default=None,
+                        help='spectrum store for collect to add the spectra to, see spectrumstore.py')
+    args = parser.parse_args()
+    if args.command == 'worker':
+        print(f'finished {run_worker(args.scan_dir, args.stale_after)} shards')
+    elif args.command == 'status':
+        print(status(args.scan_dir))
+    else:
+        spectra = collect(args.scan_dir)
+        final_result = np.column_stack([load_spec(args.scan_dir)['flist']] + list(spectra))
+        if args.output is not None:
+            np.savetxt(args.output, final_result)
+        if args.store is not None:
+            spec = load_spec(args.scan_dir)
+            columns = ('Lambda', 'v') if spec['defect'] == 'DWBoundedbyCS' else ('Lambda',)
+            with spectrumstore.SpectrumStore(args.store, columns) as store:
+                for params, spectrum in zip(spec['grid'], spectra):
+                    store.append(params, spec['flist'], spectrum)
+        print(final_result)
@@ -12,15 +12,17 @@ doi:10.1103/PhysRevD.106.075030
 
 """
 
-from scipy.interpolate import interp1d
 import numpy as np
-import sympy as sp
-import scipy.integrate as spi
 import scipy.optimize as spo
 import scipy.special as sps
+import cosmobackground
+import kmodesum
+import resultcache
+import loopintegration
+import loopkernels
 
 class DWBoundedbyCS:
-    def __init__(self):
+    def __init__(self, background=None):
         # first we initialize the constants
         self.cmitoGeV = 1.98e-14 # converts 1/cm to GeV
         self.HztoGeV = 6.58e-25 # converts 1/s to GeV
@@ -41,44 +43,203 @@ class DWBoundedbyCS:
         self.zeta_value = sps.zeta(4./3)
         self.Cc = 1 / np.sqrt(8 * np.pi ** 3 * 106.75 / 90)
         # import scale factor a as a function of time in GeV^-1
-        self.adata = np.loadtxt("a_evolution_in_Standard_cosmology.dat")
-        self.ax = self.adata[:, 0]
-        self.ay = self.adata[:, 1]
-        self.ascalef = interp1d(self.ax, self.ay, kind='linear') # interpolation of scale factor
+        # any background from cosmobackground.py can be passed instead, e.g. a
+        # non-standard expansion history; today is then where it reaches a = 1
+        self.background = background
+        if background is None:
+            self.ascalef = cosmobackground.scale_factor("a_evolution_in_Standard_cosmology.dat") # shared log-log interpolation
+        else:
+            self.ascalef = background
+            self.t0 = background.time_of(1.)
+            self.teq = self.t0 / (1+self.zeq) ** (3./2)
+        self.adata = self.ascalef.data
+        self.ax = self.ascalef.t
+        self.ay = self.ascalef.a
         self.q, self.r, self.s = self.Gamma_interp()
+        self.cache = None # persistent result cache, see use_cache
+        # integration over the log-time grid, see loopintegration.py
+        self.integration = 'trapezoid' # 'trapezoid', 'simpson', 'adaptive' or 'quad'
+        self.ngrid = 300 # number of log-time points (initial points for 'adaptive')
+        self.rtol = 1e-4 # target relative error for 'adaptive'
+        self.backend = 'numpy' # 'numpy' or 'numba' for the compiled integrands, see loopkernels.py
+    
+    # keep the calculated GW amplitudes in a persistent on-disk cache, so that
+    # they are only calculated once, see resultcache.py
+    def use_cache(self, path='OmegaGW_cache.sqlite', max_entries=10000000):
+        self.cache = resultcache.ResultCache(path, max_entries)
+    
+    # True if the integrands are evaluated by the compiled kernels; without
+    # numba the NumPy implementation is used whatever the backend
+    def compiled(self):
+        if self.backend not in ('numpy', 'numba'):
+            raise ValueError(f"unknown backend {self.backend}, choose from ('numpy', 'numba')")
+        return self.backend == 'numba' and loopkernels.load()
     
     def Ceff(self, t):
+        if self.background is not None:
+            return self.Ceff_vec(t)[()]
         return self.CeffR if t < self.teq else self.CeffM
     
     # define Gamma_s for the hybrid defect fitting the curve of Fig. 14
-    # of the above reference
+    # of the above reference: Gamma_s = q x^2 + r x + s with Gamma_s(1e-3) =
+    # GammaS, a flat start Gamma_s'(1e-3) = 0 and Gamma_s(100) = 3.7 * 100^2,
+    # a linear system for (q, r, s)
     def Gamma_interp(self):
-        x, q, r, s = sp.symbols('x q r s')
-        Gammainterp = sp.lambdify(x, q*x**2 + r*x + s)
-        Gammainterpdiff = sp.lambdify(x, sp.diff(Gammainterp(x), x))
-        eq1 = sp.Eq(Gammainterp(1.e-3), self.GammaS)
-        eq2 = sp.Eq(Gammainterpdiff(1.e-3), 0)
-        eq3 = sp.Eq(Gammainterp(100.), 3.7 * 100**2)
-        solution = sp.solve((eq1, eq2, eq3), (q, r, s))        
-        return float(solution[q]), float(solution[r]), float(solution[s])
+        x1, x2 = 1.e-3, 100.
+        conditions = np.array([[x1**2, x1, 1.],
+                               [2 * x1, 1., 0.],
+                               [x2**2, x2, 1.]])
+        q, r, s = np.linalg.solve(conditions, [self.GammaS, 0., 3.7 * x2**2])
+        return float(q), float(r), float(s)
     
     def Gamma_s(self, r_over_rc):
         return self.q * r_over_rc**2 + self.r * r_over_rc + self.s
     
+    # closed form of the loop-length integral
+    #   int_{x1}^{x2} (1 + x) / Gamma_s(x) dx,  x = l / (2 pi Rc),
+    # written in terms of differences so that it stays accurate when x2 - x1
+    # is tiny compared to x1. The fitted quadratic has no real roots
+    # (D = 4qs - r^2 > 0), hence the arctan form.
+    def loop_length_integral(self, x1, x2):
+        sqrtD = np.sqrt(4 * self.q * self.s - self.r**2)
+        dx = x2 - x1
+        # ln Gamma_s(x2) - ln Gamma_s(x1)
+        dlog = np.log1p(dx * (self.q * (x2 + x1) + self.r) / self.Gamma_s(x1))
+        # arctan(a2) - arctan(a1) with a = (2qx + r)/sqrt(D)
+        a1 = (2 * self.q * x1 + self.r) / sqrtD
+        a2 = (2 * self.q * x2 + self.r) / sqrtD
+        datan = np.arctan2(2 * self.q * dx / sqrtD, 1 + a1 * a2)
+        return dlog / (2 * self.q) + (1 - self.r / (2 * self.q)) * 2 / sqrtD * datan
+    
     # calculate the time when a loop emitting GW at time tt was created
     def tiDWCS(self, Gmu, tt, Rc, k, f):
-        integrand = lambda lp: (1 + lp / (2*np.pi*Rc)) / self.Gamma_s(lp / (2*np.pi*Rc))
-        equation = lambda tik: spi.quad(integrand, (self.xi * k) / f * \
-                        self.ascalef(tt) / self.ascalef(self.t0), self.alpha * tik, limit=100)[0] - \
-                        Gmu * (tt - tik)
-        return spo.brentq(equation, (self.xi * k) / (self.alpha * f) * \
-                          self.ascalef(tt) / self.ascalef(self.t0), tt, maxiter = 1000) \
-                          if (self.alpha * tt >= (self.xi * k) / f * \
-                              self.ascalef(tt) / self.ascalef(self.t0)) \
-                                            else 0
+        lk = (self.xi * k) / f * self.ascalef(tt) / self.ascalef(self.t0)
+        equation = lambda tik: 2*np.pi*Rc * self.loop_length_integral(lk / (2*np.pi*Rc), \
+                        self.alpha * tik / (2*np.pi*Rc)) - Gmu * (tt - tik)
+        return spo.brentq(equation, lk / self.alpha, tt, maxiter = 1000) \
+                          if (self.alpha * tt >= lk) else 0
         # The loops being created at tt must have larger size than the loops \
         # already emitting GW at tt .
     
+    # vectorized version of Ceff for an array of times
+    def Ceff_vec(self, t):
+        if self.background is not None:
+            # radiation-like or faster expansion (w > 1/6) takes CeffR, slower CeffM
+            return np.where(self.background.eos(t) > 1./6, self.CeffR, self.CeffM)
+        return np.where(t < self.teq, self.CeffR, self.CeffM)
+    
+    # vectorized version of tiDWCS; tt, k, f, Gmu and Rc can be any
+    # broadcastable arrays. The root is found with a bracketed Newton
+    # iteration on the closed-form loop-length integral for all grid points
+    # at once.
+    # aratio = a(tt)/a(t0) can be passed in to avoid repeating the lookup.
+    def tiDWCS_vec(self, Gmu, tt, Rc, k, f, aratio=None, rtol=1e-14, maxiter=100):
+        tt = np.asarray(tt, dtype=float)
+        if aratio is None:
+            aratio = self.ascalef(tt) / self.ascalef(self.t0)
+        lk = (self.xi * k) / f * aratio
+        tt, lk, Gmu, Rc = np.broadcast_arrays(tt, lk, Gmu, Rc)
+        ti = np.zeros(tt.shape)
+        # causality condition applied as a mask, tiDWCS = 0 where it fails
+        mask = self.alpha * tt >= lk
+        if not mask.any():
+            return ti
+        ttm, Gmu, Rc = tt[mask], Gmu[mask], Rc[mask]
+        x1 = lk[mask] / (2*np.pi*Rc)
+        lo = lk[mask] / self.alpha
+        hi = ttm.copy()
+        # initial guess: Gamma_s is constant for loops much smaller than Rc
+        G0 = self.Gamma_s(x1)
+        tik = np.clip((self.alpha * lo / G0 + Gmu * ttm) / (self.alpha / G0 + Gmu), lo, hi)
+        # every root stops at its own convergence, as in loopkernels.ti_dwcs;
+        # only the roots still moving are iterated
+        roots = tik.copy()
+        active = np.arange(len(tik))
+        for _ in range(maxiter):
+            x2 = self.alpha * tik / (2*np.pi*Rc)
+            g = 2*np.pi*Rc * self.loop_length_integral(x1, x2) - Gmu * (ttm - tik)
+            dg = self.alpha * (1 + x2) / self.Gamma_s(x2) + Gmu
+            lo = np.where(g < 0, tik, lo)
+            hi = np.where(g > 0, tik, hi)
+            newton = tik - g / dg
+            # fall back to bisection whenever Newton leaves the bracket
+            tnew = np.where((newton > lo) & (newton < hi), newton, 0.5 * (lo + hi))
+            tnew = np.where(g == 0, tik, tnew)
+            moving = np.abs(tnew - tik) > rtol * tik
+            roots[active] = tnew
+            if not moving.any():
+                break
+            active, tik, lo, hi = active[moving], tnew[moving], lo[moving], hi[moving]
+            x1, ttm, Gmu, Rc = x1[moving], ttm[moving], Gmu[moving], Rc[moving]
+        ti[mask] = roots
+        return ti
+    
+    # the window of emission times (t_lo, t_hi) outside which the integrand
+    # vanishes; Gmu, tstar, Rc, k and f can be broadcastable arrays. Loops
+    # emitting the mode k at tt exist once alpha * tt >= l_k(tt), i.e.
+    # tt/a(tt) reaches xi k / (alpha f a0), which is found from the table of
+    # the scale factor. They stop contributing once they were created after
+    # tstar, i.e. once a loop created at tstar has shrunk below l_k(tt), found
+    # by bisection in log tt. The window is empty where t_lo >= t_hi.
+    def supportDWCS(self, Gmu, tstar, Rc, k, f, iterations=60):
+        a0 = self.ascalef(self.t0)
+        lk_over_a = np.asarray(self.xi * k / f / a0, dtype=float)
+        # log(t/a) grows along the table, log-log interpolation as in ascalef;
+        # the start of the window only depends on k and f
+        logt_lo = np.interp(np.log(lk_over_a / self.alpha), self.ascalef.logt - self.ascalef.loga,
+                            self.ascalef.logt, left=-np.inf, right=np.inf)
+        t_lo = np.maximum(np.exp(logt_lo), self.tF)
+        lk_over_a, t_lo, Gmu, tstar, Rc = np.broadcast_arrays(lk_over_a, t_lo, Gmu, tstar, Rc)
+        # h > 0 while the loop created at tstar is still longer than l_k(tt)
+        x2 = self.alpha * tstar / (2*np.pi*Rc)
+        def h(logtt, lka, Gmu, tstar, Rc, x2):
+            x1 = lka * self.ascalef(np.exp(logtt)) / (2*np.pi*Rc)
+            # once l_k(tt) exceeds the initial length of the loop, h < 0; the
+            # closed form is not evaluated there, it loses all accuracy
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(x1 < x2, 2*np.pi*Rc * self.loop_length_integral(x1, x2) - Gmu * (np.exp(logtt) - tstar),
+                                -np.inf)
+        # before tstar every existing loop was created before tstar
+        lo = np.log(np.clip(np.maximum(t_lo, tstar), self.tF, self.t0))
+        hi = np.full(lo.shape, np.log(self.t0))
+        h_hi = h(hi, lk_over_a, Gmu, tstar, Rc, x2)
+        t_hi = np.where(h_hi > 0, self.t0, np.exp(lo))
+        bisect = (h_hi <= 0) & (h(lo, lk_over_a, Gmu, tstar, Rc, x2) > 0)
+        if bisect.any():
+            params = [p[bisect] for p in (lk_over_a, Gmu, tstar, Rc, x2)]
+            lo, hi = lo[bisect], hi[bisect]
+            for _ in range(iterations):
+                mid = 0.5 * (lo + hi)
+                positive = h(mid, *params) > 0
+                lo = np.where(positive, mid, lo)
+                hi = np.where(positive, hi, mid)
+            # the last time inside, so that a time grid ends on the jump of
+            # the integrand instead of losing the interval across it; moved
+            # in by 1e-12 so that the creation time found there stays below
+            # tstar despite rounding
+            t_hi[bisect] = np.exp(lo - 1e-12)
+        return t_lo, t_hi
+    
+    # largest k-mode up to kmax that contributes at the frequency freq, 0 if
+    # none does. Higher modes start later and stop earlier, so this is a
+    # binary search on the emptiness of supportDWCS.
+    def kmaxDWCS(self, Lambda, v, freq, kmax):
+        Rc = Lambda ** 2 / v ** 3
+        tstar = max(Rc, self.Mpl * self.Cc / v ** 2)
+        Gmu = self.G * Lambda**2
+        f = freq * self.HztoGeV
+        contributes = lambda k: np.all(np.less(*self.supportDWCS(Gmu, tstar, Rc, k, f)))
+        if not contributes(1):
+            return 0
+        lo, hi = 1, kmax
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if contributes(mid):
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+    
     # calculate the integrand
     def OmegaintegrandDWCS(self, Gmu, tt, tstar, Rc, k, f):
         tk = self.tiDWCS(Gmu, tt, Rc, k, f)
@@ -91,8 +252,47 @@ class DWBoundedbyCS:
                       if (tk != 0 and tstar > tk) else 0
         return Ogintegrand
     
+    # vectorized version of OmegaintegrandDWCS evaluated on the whole time
+    # grid at once; tt, tstar, Rc, k, f and Gmu can be any broadcastable
+    # arrays
+    def OmegaintegrandDWCS_vec(self, Gmu, tt, tstar, Rc, k, f, aratio=None):
+        tt = np.asarray(tt, dtype=float)
+        a0 = self.ascalef(self.t0)
+        if aratio is None:
+            aratio = self.ascalef(tt) / a0
+        tk = self.tiDWCS_vec(Gmu, tt, Rc, k, f, aratio)
+        Ogintegrand = np.zeros(tk.shape)
+        mask = (tk != 0) & (tstar > tk)
+        if not mask.any():
+            return Ogintegrand
+        # only evaluate the scale factor where the loops actually exist
+        tkm = tk[mask]
+        Gmum, Rcm = np.broadcast_to(Gmu, tk.shape)[mask], np.broadcast_to(Rc, tk.shape)[mask]
+        aratiom = np.broadcast_to(aratio, tk.shape)[mask]
+        Pk = k ** (-4./3) / self.zeta_value
+        kfactor = np.broadcast_to(Pk * self.xi * k / f, tk.shape)[mask]
+        kfRc = np.broadcast_to(self.xi * k / (2 * np.pi * Rc * f), tk.shape)[mask]
+        Gammam = self.Gamma_s(self.alpha * tkm / (2 * np.pi * Rcm))
+        Ogintegrand[mask] = aratiom**5 * self.F * self.Ceff_vec(tkm) / (self.alpha * tkm**4.) * \
+                            (self.ascalef(tkm) / (aratiom * a0))**3 * kfactor * \
+                            (1. + kfRc * aratiom) * \
+                            Gammam / (Gammam * Gmum + self.alpha * (1 + self.alpha * tkm / (2 * np.pi * Rcm)))
+        return Ogintegrand
+    
     # perform the integration to calculate the GW amplitude
     def OmegaGWcalcDWCS(self, Lambda, v, freq, k):
+        if self.cache is not None:
+            model = resultcache.model_key(self)
+            result = self.cache.get(model, Lambda, v, freq, k)
+            if result is None:
+                result = self.OmegaGWintegrateDWCS(Lambda, v, freq, k)
+                self.cache.put(model, Lambda, v, freq, k, result)
+            return result
+        return self.OmegaGWintegrateDWCS(Lambda, v, freq, k)
+    
+    # the GW amplitude behind OmegaGWcalcDWCS; with full_output it also
+    # returns the error estimate of the time integration
+    def OmegaGWintegrateDWCS(self, Lambda, v, freq, k, full_output=False):
         Rc = Lambda ** 2 / v ** 3
         tDW = self.Mpl * self.Cc / v ** 2
         tstar = max(Rc, tDW)
@@ -101,27 +301,100 @@ class DWBoundedbyCS:
         
         prefactor = Gmu ** 2 / (self.G * self.rhocrit)
         
-        # integrand
-        ttlist = np.linspace(np.log(self.tF), np.log(self.t0), num = 300)
-        Omegalist = np.array([0.] * len(ttlist))
-        for i in range(len(ttlist)):
-            Omegalist[i] = (self.OmegaintegrandDWCS(Gmu, np.exp(ttlist[i]), tstar, Rc, k, f)) 
-           
-        nonzero_indices = np.nonzero(Omegalist)[0]   
-        Omegatable = np.log(np.array(Omegalist[nonzero_indices]))
-        tttable = np.array(ttlist[nonzero_indices])
+        # the time grid only covers the emission window of this mode
+        t_lo, t_hi = self.supportDWCS(Gmu, tstar, Rc, k, f)
+        if not t_lo < t_hi:
+            return (0., 0.) if full_output else 0.
         
-        # integration in log-log space
-        if len(nonzero_indices) > 0:
-            Omegainterp = interp1d(tttable, np.exp(Omegatable + tttable), kind='linear')
-            def Omegainterpintegrand(x):
-                return Omegainterp(x)
-            result = prefactor * self.h**2 * spi.quad(Omegainterpintegrand, tttable[0], tttable[-1])[0]
-            return result
+        # integrand in log time
+        if self.compiled():
+            gamma = (float(self.q), float(self.r), float(self.s))
+            table, constants = loopkernels.table_args(self.ascalef), loopkernels.constants_args(self)
+            def integrand(x):
+                return loopkernels.checked(loopkernels.integrand_dwcs(np.asarray(x, dtype=float), Gmu, tstar, Rc,
+                                                                      float(k), f, gamma, table, constants))
         else:
-            return 0
+            def integrand(x):
+                return self.OmegaintegrandDWCS_vec(Gmu, np.exp(x), tstar, Rc, k, f) * np.exp(x)
+        result, error = loopintegration.integrate(integrand, np.log(t_lo), np.log(t_hi),
+                                                  self.integration, self.ngrid, self.rtol)
+        result *= prefactor * self.h**2
+        error *= prefactor * self.h**2
+        return (result, error) if full_output else result
     
+    # calculate the GW spectrum summed over the k-modes from k = 1 to kmax
+    # using Omega_k(f) = k^(-4/3) * Omega_1(f/k), see kmodesum.py. Only the
+    # fundamental mode is integrated, on a dense grid with nperdecade
+    # frequencies per decade.
+    def OmegaGWresumDWCS(self, Lambda, v, flist, kmax, ksum=True, nperdecade=20):
+        f_dense = kmodesum.dense_grid(flist, kmax, nperdecade)
+        Omega1_dense = np.array([self.OmegaGWcalcDWCS(Lambda, v, freq, 1) for freq in f_dense])
+        return kmodesum.resum_kmodes(flist, kmax, f_dense, Omega1_dense, ksum)
     
-
+    # calculate the GW amplitude of the k-modes in klist at the frequencies in
+    # flist for every point of the grid of Lambdas and vs in one batched
+    # computation. Returns the k-summed spectra, of shape (len(Lambdas),
+    # len(vs), len(flist)), if ksum is True, otherwise with the k-modes along
+    # a last axis. chunk bounds the number of integrand samples held at once.
+    # The batch always uses the trapezoid rule on the ngrid log-time grid.
+    def OmegaGWgridDWCS(self, Lambdas, vs, flist, klist, ksum=True, chunk=2000000):
+        Lambdas = np.atleast_1d(np.asarray(Lambdas, dtype=float))
+        vs = np.atleast_1d(np.asarray(vs, dtype=float))
+        flist = np.atleast_1d(np.asarray(flist, dtype=float))
+        karr = np.atleast_1d(np.asarray(klist, dtype=float))
+        Lambda, v = (x.ravel() for x in np.meshgrid(Lambdas, vs, indexing='ij'))
+        if self.cache is not None:
+            # only the points with cells missing from the cache are calculated;
+            # they are cached as trapezoid results, the rule the batch uses
+            result = resultcache.cached_grid(self.cache, resultcache.model_key(self, integration='trapezoid'),
+                                             Lambda, v, flist, karr,
+                                             lambda p: self.OmegaGWtableDWCS(Lambda[p], v[p], flist, karr, chunk))
+        else:
+            result = self.OmegaGWtableDWCS(Lambda, v, flist, karr, chunk)
+        result = result.reshape(len(Lambdas), len(vs), len(flist), len(karr))
+        return result.sum(axis=-1) if ksum else result
     
-
+    # the (point, f, k) table of GW amplitudes behind OmegaGWgridDWCS for the
+    # points (Lambda[p], v[p]). The work shared between cells is done once:
+    # Rc, tstar and Gmu per point, the start of the emission window per mode
+    # and frequency. The windows of all (point, f, k) cells are then found
+    # together, and the cells with a non-empty window are integrated in
+    # batches, each on its own log-time grid, in the order of the grid.
+    def OmegaGWtableDWCS(self, Lambda, v, flist, karr, chunk=2000000):
+        Rc = Lambda ** 2 / v ** 3
+        tDW = self.Mpl * self.Cc / v ** 2
+        tstar = np.maximum(Rc, tDW)
+        Gmu = self.G * Lambda**2
+        f = flist * self.HztoGeV
+        
+        prefactor = Gmu ** 2 / (self.G * self.rhocrit)
+        
+        result = np.zeros((len(Lambda), len(f), len(karr)))
+        kchunk = max(1, chunk // (len(Lambda) * len(f)))
+        ascending = np.all(np.diff(karr) > 0)
+        ncells = max(1, chunk // self.ngrid)
+        for start in range(0, len(karr), kchunk):
+            kc = karr[start:start + kchunk]
+            t_lo, t_hi = self.supportDWCS(Gmu[:, None, None], tstar[:, None, None], Rc[:, None, None],
+                                          kc[None, None, :], f[None, :, None])
+            cells = np.nonzero(t_lo < t_hi)
+            if len(cells[0]) == 0 and ascending:
+                break # higher modes start later and stop earlier, none of them contributes
+            for c in range(0, len(cells[0]), ncells):
+                p, i, j = (index[c:c + ncells] for index in cells)
+                # integrand in log time
+                x = np.linspace(np.log(t_lo[p, i, j]), np.log(t_hi[p, i, j]), self.ngrid, axis=-1)
+                tt = np.exp(x)
+                y = self.OmegaintegrandDWCS_vec(Gmu[p, None], tt, tstar[p, None], Rc[p, None],
+                                                kc[j, None], f[i, None]) * tt
+                result[p, i, start + j] = prefactor[p] * self.h**2 * loopintegration.trapz_nonzero(y, x)
+        return result
+    
+    # the k-summed spectra of the grid of Lambdas and vs from the fundamental
+    # mode, as in OmegaGWresumDWCS; the fundamental mode of all the points is
+    # calculated in one batch with OmegaGWgridDWCS
+    def OmegaGWresumgridDWCS(self, Lambdas, vs, flist, kmax, ksum=True, nperdecade=20):
+        f_dense = kmodesum.dense_grid(flist, kmax, nperdecade)
+        Omega1_dense = self.OmegaGWgridDWCS(Lambdas, vs, f_dense, [1])
+        return np.array([[kmodesum.resum_kmodes(flist, kmax, f_dense, Omega1, ksum) for Omega1 in row]
+                         for row in Omega1_dense])
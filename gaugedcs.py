@@ -13,13 +13,16 @@ doi:10.1103/PhysRevD.106.075030
 
 """
 
-from scipy.interpolate import interp1d
 import numpy as np
-import scipy.integrate as spi
 import scipy.special as sps
+import cosmobackground
+import kmodesum
+import resultcache
+import loopintegration
+import loopkernels
 
 class CosmicString:
-    def __init__(self):
+    def __init__(self, background=None):
         # first we initialize the constants
         self.cmitoGeV = 1.98e-14 # converts 1/cm to GeV
         self.HztoGeV = 6.58e-25 # converts 1/s to GeV
@@ -40,12 +43,40 @@ class CosmicString:
         self.zeta_value = sps.zeta(4./3)
         self.Cc = 1 / np.sqrt(8 * np.pi ** 3 * 106.75 / 90)
         # import scale factor a as a function of time in GeV^-1
-        self.adata = np.loadtxt("a_evolution_in_Standard_cosmology.dat")
-        self.ax = self.adata[:, 0]
-        self.ay = self.adata[:, 1]
-        self.ascalef = interp1d(self.ax, self.ay, kind='linear') # interpolation of scale factor
+        # any background from cosmobackground.py can be passed instead, e.g. a
+        # non-standard expansion history; today is then where it reaches a = 1
+        self.background = background
+        if background is None:
+            self.ascalef = cosmobackground.scale_factor("a_evolution_in_Standard_cosmology.dat") # shared log-log interpolation
+        else:
+            self.ascalef = background
+            self.t0 = background.time_of(1.)
+            self.teq = self.t0 / (1+self.zeq) ** (3./2)
+        self.adata = self.ascalef.data
+        self.ax = self.ascalef.t
+        self.ay = self.ascalef.a
+        self.cache = None # persistent result cache, see use_cache
+        # integration over the log-time grid, see loopintegration.py
+        self.integration = 'trapezoid' # 'trapezoid', 'simpson', 'adaptive' or 'quad'
+        self.ngrid = 300 # number of log-time points (initial points for 'adaptive')
+        self.rtol = 1e-4 # target relative error for 'adaptive'
+        self.backend = 'numpy' # 'numpy' or 'numba' for the compiled integrands, see loopkernels.py
+    
+    # keep the calculated GW amplitudes in a persistent on-disk cache, so that
+    # they are only calculated once, see resultcache.py
+    def use_cache(self, path='OmegaGW_cache.sqlite', max_entries=10000000):
+        self.cache = resultcache.ResultCache(path, max_entries)
+    
+    # True if the integrands are evaluated by the compiled kernels; without
+    # numba the NumPy implementation is used whatever the backend
+    def compiled(self):
+        if self.backend not in ('numpy', 'numba'):
+            raise ValueError(f"unknown backend {self.backend}, choose from ('numpy', 'numba')")
+        return self.backend == 'numba' and loopkernels.load()
     
     def Ceff(self, t):
+        if self.background is not None:
+            return self.Ceff_vec(t)[()]
         return self.CeffR if t < self.teq else self.CeffM
     
     
@@ -61,6 +92,23 @@ class CosmicString:
         # The loops being created at tt must have larger size than the loops \
         # already emitting GW at tt .
     
+    # vectorized version of Ceff for an array of times
+    def Ceff_vec(self, t):
+        if self.background is not None:
+            # radiation-like or faster expansion (w > 1/6) takes CeffR, slower CeffM
+            return np.where(self.background.eos(t) > 1./6, self.CeffR, self.CeffM)
+        return np.where(t < self.teq, self.CeffR, self.CeffM)
+    
+    # vectorized version of tiCS; tt, k and f can be any broadcastable arrays.
+    # aratio = a(tt)/a(t0) can be passed in to avoid repeating the lookup.
+    def tiCS_vec(self, Gmu, tt, k, f, aratio=None):
+        tt = np.asarray(tt, dtype=float)
+        if aratio is None:
+            aratio = self.ascalef(tt) / self.ascalef(self.t0)
+        ti = 1 / (self.alpha + self.GammaS*Gmu) * (2*k/f * aratio + self.GammaS * Gmu * tt)
+        # causality condition applied as a mask, tiCS = 0 where it fails
+        return np.where(self.alpha * tt >= (self.xi * k) / f * aratio, ti, 0.)
+    
     # calculate the integrand
     def OmegaintegrandCS(self, Gmu, tt, k, f):
         tk = self.tiCS(Gmu, tt, k, f)
@@ -71,34 +119,112 @@ class CosmicString:
                       if (tk != 0) else 0
         return Ogintegrand
     
+    # vectorized version of OmegaintegrandCS evaluated on the whole time grid
+    # at once; tt, k and f can be any broadcastable arrays
+    def OmegaintegrandCS_vec(self, Gmu, tt, k, f, aratio=None):
+        tt = np.asarray(tt, dtype=float)
+        a0 = self.ascalef(self.t0)
+        if aratio is None:
+            aratio = self.ascalef(tt) / a0
+        tk = self.tiCS_vec(Gmu, tt, k, f, aratio)
+        Ogintegrand = np.zeros(tk.shape)
+        mask = tk != 0
+        if not mask.any():
+            return Ogintegrand
+        # only evaluate the scale factor where the loops actually exist
+        tkm = tk[mask]
+        aratiom = np.broadcast_to(aratio, tk.shape)[mask]
+        Pk = k ** (-4./3) / self.zeta_value
+        kfactor = np.broadcast_to(Pk * self.xi * k / f, tk.shape)[mask]
+        Ogintegrand[mask] = aratiom**5 * self.F * self.Ceff_vec(tkm) / (self.alpha * tkm**4.) * \
+                            (self.ascalef(tkm) / (aratiom * a0))**3 * kfactor * \
+                            self.GammaS / (self.alpha + self.GammaS* Gmu)
+        return Ogintegrand
+    
     # perform the integration to calculate the GW amplitude
     def OmegaGWcalcCS(self, Lambda, freq, k):
+        if self.cache is not None:
+            model = resultcache.model_key(self)
+            result = self.cache.get(model, Lambda, 0., freq, k)
+            if result is None:
+                result = self.OmegaGWintegrateCS(Lambda, freq, k)
+                self.cache.put(model, Lambda, 0., freq, k, result)
+            return result
+        return self.OmegaGWintegrateCS(Lambda, freq, k)
+    
+    # the GW amplitude behind OmegaGWcalcCS; with full_output it also
+    # returns the error estimate of the time integration
+    def OmegaGWintegrateCS(self, Lambda, freq, k, full_output=False):
         Gmu = self.G * Lambda**2
         f = freq * self.HztoGeV
         
         prefactor = Gmu ** 2 / (self.G * self.rhocrit)
         
-        # integrand
-        ttlist = np.linspace(np.log(self.tF), np.log(self.t0), num = 300)
-        Omegalist = np.array([0.] * len(ttlist))
-        for i in range(len(ttlist)):
-            Omegalist[i] = (self.OmegaintegrandCS(Gmu, np.exp(ttlist[i]), k, f)) 
-           
-        nonzero_indices = np.nonzero(Omegalist)[0]   
-        Omegatable = np.log(np.array(Omegalist[nonzero_indices]))
-        tttable = np.array(ttlist[nonzero_indices])
-        
-        # integration in log-log space
-        if len(nonzero_indices) > 0:
-            Omegainterp = interp1d(tttable, np.exp(Omegatable + tttable), kind='linear')
-            def Omegainterpintegrand(x):
-                return Omegainterp(x)
-            result = prefactor * self.h**2 * spi.quad(Omegainterpintegrand, tttable[0], tttable[-1])[0]
-            return result
+        # integrand in log time
+        if self.compiled():
+            table, constants = loopkernels.table_args(self.ascalef), loopkernels.constants_args(self)
+            def integrand(x):
+                return loopkernels.checked(loopkernels.integrand_cs(np.asarray(x, dtype=float), Gmu, float(k), f,
+                                                                    table, constants))
         else:
-            return 0
+            def integrand(x):
+                return self.OmegaintegrandCS_vec(Gmu, np.exp(x), k, f) * np.exp(x)
+        result, error = loopintegration.integrate(integrand, np.log(self.tF), np.log(self.t0),
+                                                  self.integration, self.ngrid, self.rtol)
+        result *= prefactor * self.h**2
+        error *= prefactor * self.h**2
+        return (result, error) if full_output else result
     
+    # calculate the GW amplitude for every pair of frequencies in flist and
+    # k-modes in klist in one broadcasted computation. The time grid and the
+    # scale factor along it are shared by all (f, k) pairs. Returns the
+    # k-summed spectrum if ksum is True, otherwise an array of shape
+    # (len(flist), len(klist)). kchunk sets how many k-modes are processed
+    # together, to keep the memory use bounded for large kmax. The batch
+    # always uses the trapezoid rule on the ngrid log-time grid.
+    def OmegaGWspectrumCS(self, Lambda, flist, klist, ksum=True, kchunk=None):
+        flist = np.atleast_1d(np.asarray(flist, dtype=float))
+        karr = np.atleast_1d(np.asarray(klist, dtype=float))
+        if self.cache is not None:
+            # only the (f, k) cells missing from the cache are calculated; they
+            # are cached as trapezoid results, the rule the batch uses
+            result = resultcache.cached_table(self.cache, resultcache.model_key(self, integration='trapezoid'),
+                                              Lambda, 0., flist, karr,
+                                              lambda fsub, ksub: self.OmegaGWtableCS(Lambda, fsub, ksub, kchunk))
+        else:
+            result = self.OmegaGWtableCS(Lambda, flist, karr, kchunk)
+        return result.sum(axis=1) if ksum else result
     
-
+    # the (f, k) table of GW amplitudes behind OmegaGWspectrumCS
+    def OmegaGWtableCS(self, Lambda, flist, karr, kchunk=None):
+        Gmu = self.G * Lambda**2
+        f = flist * self.HztoGeV
+        
+        prefactor = Gmu ** 2 / (self.G * self.rhocrit)
+        
+        ttlist = np.linspace(np.log(self.tF), np.log(self.t0), num = self.ngrid)
+        if self.compiled():
+            result = loopkernels.table_cs(f, karr, ttlist, Gmu, loopkernels.table_args(self.ascalef),
+                                          loopkernels.constants_args(self))
+            return prefactor * self.h**2 * loopkernels.checked(result)
+        tt = np.exp(ttlist)
+        aratio = self.ascalef(tt) / self.ascalef(self.t0)
+        
+        if kchunk is None:
+            kchunk = max(1, 2000000 // (len(f) * len(ttlist)))
+        result = np.zeros((len(f), len(karr)))
+        for start in range(0, len(karr), kchunk):
+            kc = karr[start:start + kchunk]
+            # integrand on the (f, k, t) grid
+            Omegalist = self.OmegaintegrandCS_vec(Gmu, tt, kc[None, :, None], f[:, None, None], aratio)
+            result[:, start:start + kchunk] = loopintegration.trapz_nonzero(Omegalist * tt, ttlist)
+        return prefactor * self.h**2 * result
     
-
+    # calculate the GW spectrum summed over the k-modes from k = 1 to kmax
+    # using Omega_k(f) = k^(-4/3) * Omega_1(f/k), see kmodesum.py. Only the
+    # fundamental mode is integrated, on a dense grid with nperdecade
+    # frequencies per decade.
+    def OmegaGWresumCS(self, Lambda, flist, kmax, ksum=True, nperdecade=20):
+        f_dense = kmodesum.dense_grid(flist, kmax, nperdecade)
+        Omega1_dense = self.OmegaGWspectrumCS(Lambda, f_dense, [1])
+        return kmodesum.resum_kmodes(flist, kmax, f_dense, Omega1_dense, ksum)
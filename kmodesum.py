@@ -0,0 +1,50 @@
+"""
+This script implements the resummation of the k-modes of the GW spectrum. For
+both pure gauged strings and domain walls bounded by strings, the k dependence
+of the integrand enters only through P_k = k^(-4/3) / zeta(4/3) and through the
+combination k/f. The spectrum of the k-th mode is therefore related to that
+of the fundamental mode by
+
+    Omega_k(f) = k^(-4/3) * Omega_1(f/k).
+
+The fundamental-mode spectrum is calculated once on a dense frequency grid and
+the sum over k-modes is built by rescaling and interpolating it, so that the
+cost hardly depends on the number of k-modes.
+
+"""
+import numpy as np
+
+# dense log-spaced frequency grid covering f/k for every f in flist and every
+# k-mode from 1 up to kmax
+def dense_grid(flist, kmax, nperdecade=20):
+    fmin = np.min(flist) / kmax
+    fmax = np.max(flist)
+    ndecades = np.log10(fmax / fmin)
+    num = max(2, int(np.ceil(ndecades * nperdecade)) + 1)
+    return np.logspace(np.log10(fmin), np.log10(fmax), num)
+
+# interpolate a spectrum tabulated on f_dense at the frequencies f. The
+# interpolation is done in log-log space where the spectrum is nonzero at
+# both ends of the interval and linearly across the zero/nonzero transitions.
+def loglog_interp(f, f_dense, Omega_dense):
+    logf = np.log(f)
+    logf_dense = np.log(f_dense)
+    positive = Omega_dense > 0
+    logOmega = np.log(np.where(positive, Omega_dense, 1.))
+    both_positive = np.interp(logf, logf_dense, positive.astype(float)) == 1.
+    Omega_log = np.exp(np.interp(logf, logf_dense, logOmega))
+    Omega_lin = np.interp(logf, logf_dense, Omega_dense, left=0., right=0.)
+    return np.where(both_positive, Omega_log, Omega_lin)
+
+# sum up the k-modes from k = 1 to kmax using the fundamental-mode spectrum
+# Omega1_dense tabulated on f_dense (see dense_grid). Returns the k-summed
+# spectrum if ksum is True, otherwise an array of shape (len(flist), kmax).
+def resum_kmodes(flist, kmax, f_dense, Omega1_dense, ksum=True, kchunk=1000):
+    flist = np.atleast_1d(np.asarray(flist, dtype=float))
+    karr = np.arange(1, kmax + 1, dtype=float)
+    result = np.zeros((len(flist), kmax))
+    for start in range(0, kmax, kchunk):
+        kc = karr[start:start + kchunk]
+        result[:, start:start + kchunk] = kc ** (-4./3) * \
+            loglog_interp(flist[:, None] / kc, f_dense, Omega1_dense)
+    return result.sum(axis=1) if ksum else result
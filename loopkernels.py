@@ -0,0 +1,211 @@
+"""
+This script provides compiled kernels for the loop-emission integrands of
+CosmicString and DWBoundedbyCS, used when their backend is set to 'numba':
+
+    defectGW.backend = 'numba'
+
+The kernels evaluate the integrand on the log-time grid point by point, with
+the loop creation time, the root finding of DWBoundedbyCS and the lookup in
+the scale-factor table all inlined, so that no temporary arrays are created.
+The table is passed as plain arrays, see table_args. For the batched
+CosmicString table the trapezoid rule over the nonzero samples is compiled
+as well.
+
+numba is optional and only imported when the kernels are first used. Without
+it, available is False and the defect classes use their NumPy implementation
+whatever the backend setting.
+
+"""
+import importlib.util
+import numpy as np
+
+available = importlib.util.find_spec('numba') is not None
+
+# the functions compiled by load
+KERNELS = ('locate', 'log_scale_factor', 'ceff', 'integrand_cs', 'trapz_nonzero', 'table_cs',
+           'gamma_s', 'loop_length_integral', 'ti_dwcs', 'integrand_dwcs')
+
+jitted = False
+
+# compile the kernels on their first use, so that importing this module (and
+# the defect classes) does not import numba. Returns available.
+def load():
+    global jitted
+    if available and not jitted:
+        import numba
+        for name in KERNELS:
+            globals()[name] = numba.njit(cache=True)(globals()[name])
+        jitted = True
+    return available
+
+# the scale-factor table of a cosmobackground.ScaleFactor as plain arrays
+def table_args(ascalef):
+    return (np.ascontiguousarray(ascalef.logt), np.ascontiguousarray(ascalef.loga),
+            np.ascontiguousarray(ascalef.slope), np.ascontiguousarray(ascalef.cell_knot),
+            np.ascontiguousarray(ascalef.logt_next), float(ascalef.cell_width), int(ascalef.max_advance))
+
+# the physical constants shared by both integrands
+def constants_args(defect):
+    return (float(defect.alpha), float(defect.GammaS), float(defect.xi), float(defect.F),
+            float(defect.CeffR), float(defect.CeffM), float(defect.teq), float(defect.zeta_value),
+            defect.background is not None, float(defect.ascalef(defect.t0)))
+
+# the table bin of log t, as in ScaleFactor.locate; -1 outside the table
+def locate(logt, table):
+    logt_table, loga, slope, cell_knot, logt_next, cell_width, max_advance = table
+    if not (logt_table[0] <= logt <= logt_table[-1]):
+        return -1
+    u = int((logt - logt_table[0]) / cell_width)
+    knot = cell_knot[min(u, len(cell_knot) - 1)]
+    for _ in range(max_advance):
+        if logt_next[knot] <= logt:
+            knot += 1
+    return knot
+
+def log_scale_factor(logt, knot, table):
+    return table[1][knot] + table[2][knot] * (logt - table[0][knot])
+
+# Ceff at the time t in the bin knot, as Ceff_vec of the defect classes
+def ceff(t, knot, table, constants):
+    CeffR, CeffM, teq, use_eos = constants[4], constants[5], constants[6], constants[8]
+    if use_eos:
+        return CeffR if 2. / (3 * table[2][knot]) - 1 > 1. / 6 else CeffM
+    return CeffR if t < teq else CeffM
+
+# CosmicString integrand times t at the log-times x, see OmegaintegrandCS_vec.
+# Returns nan where a time falls outside the scale-factor table.
+def integrand_cs(x, Gmu, k, f, table, constants):
+    alpha, GammaS, xi, F = constants[0], constants[1], constants[2], constants[3]
+    zeta_value, a0 = constants[7], constants[9]
+    out = np.zeros(len(x))
+    Pk = k ** (-4. / 3) / zeta_value
+    for i in range(len(x)):
+        # the scale factor is looked up at log(t) like ascalef(t), so that
+        # both backends round alike at the edges of the emission window
+        tt = np.exp(x[i])
+        logtt = np.log(tt)
+        knot = locate(logtt, table)
+        if knot < 0:
+            out[i] = np.nan
+            continue
+        aratio = np.exp(log_scale_factor(logtt, knot, table)) / a0
+        # causality condition, the loops created at tt must be larger
+        if alpha * tt < xi * k / f * aratio:
+            continue
+        tk = 1 / (alpha + GammaS * Gmu) * (2 * k / f * aratio + GammaS * Gmu * tt)
+        logtk = np.log(tk)
+        knotk = locate(logtk, table)
+        if knotk < 0:
+            out[i] = np.nan
+            continue
+        ak = np.exp(log_scale_factor(logtk, knotk, table)) / a0
+        out[i] = aratio**5 * F * ceff(tk, knotk, table, constants) / (alpha * tk**4.) * \
+                 (ak / aratio)**3 * (Pk * xi * k / f) * GammaS / (alpha + GammaS * Gmu) * tt
+    return out
+
+# integral of the piecewise-linear interpolant through the nonzero samples,
+# as loopintegration.trapz_nonzero
+def trapz_nonzero(y, x):
+    total = 0.
+    prev = -1
+    for i in range(len(y)):
+        if y[i] != 0:
+            if prev >= 0:
+                total += 0.5 * (x[i] - x[prev]) * (y[i] + y[prev])
+            prev = i
+    return total
+
+# the (f, k) table of integrals of integrand_cs over the grid x, see
+# CosmicString.OmegaGWtableCS (without the prefactor)
+def table_cs(f, karr, x, Gmu, table, constants):
+    out = np.zeros((len(f), len(karr)))
+    for i in range(len(f)):
+        for j in range(len(karr)):
+            out[i, j] = trapz_nonzero(integrand_cs(x, Gmu, karr[j], f[i], table, constants), x)
+    return out
+
+# Gamma_s and the loop-length integral of DWBoundedbyCS with the fitted
+# coefficients gamma = (q, r, s)
+def gamma_s(x, gamma):
+    return gamma[0] * x**2 + gamma[1] * x + gamma[2]
+
+def loop_length_integral(x1, x2, gamma):
+    q, r, s = gamma
+    sqrtD = np.sqrt(4 * q * s - r**2)
+    dx = x2 - x1
+    dlog = np.log1p(dx * (q * (x2 + x1) + r) / gamma_s(x1, gamma))
+    a1 = (2 * q * x1 + r) / sqrtD
+    a2 = (2 * q * x2 + r) / sqrtD
+    datan = np.arctan2(2 * q * dx / sqrtD, 1 + a1 * a2)
+    return dlog / (2 * q) + (1 - r / (2 * q)) * 2 / sqrtD * datan
+
+# creation time of the loop emitting the mode k at tt, with the bracketed
+# Newton iteration of DWBoundedbyCS.tiDWCS_vec; lk = l_k(tt) <= alpha * tt
+def ti_dwcs(tt, lk, Gmu, Rc, alpha, gamma, rtol, maxiter):
+    x1 = lk / (2 * np.pi * Rc)
+    lo = lk / alpha
+    hi = tt
+    G0 = gamma_s(x1, gamma)
+    tik = min(max((alpha * lo / G0 + Gmu * tt) / (alpha / G0 + Gmu), lo), hi)
+    for _ in range(maxiter):
+        x2 = alpha * tik / (2 * np.pi * Rc)
+        g = 2 * np.pi * Rc * loop_length_integral(x1, x2, gamma) - Gmu * (tt - tik)
+        if g == 0:
+            break
+        dg = alpha * (1 + x2) / gamma_s(x2, gamma) + Gmu
+        if g < 0:
+            lo = tik
+        else:
+            hi = tik
+        tnew = tik - g / dg
+        # fall back to bisection whenever Newton leaves the bracket
+        if not (lo < tnew < hi):
+            tnew = 0.5 * (lo + hi)
+        converged = abs(tnew - tik) <= rtol * tik
+        tik = tnew
+        if converged:
+            break
+    return tik
+
+# DWBoundedbyCS integrand times t at the log-times x, see
+# OmegaintegrandDWCS_vec. Returns nan where a time falls outside the table.
+def integrand_dwcs(x, Gmu, tstar, Rc, k, f, gamma, table, constants):
+    alpha, xi, F = constants[0], constants[2], constants[3]
+    zeta_value, a0 = constants[7], constants[9]
+    out = np.zeros(len(x))
+    Pk = k ** (-4. / 3) / zeta_value
+    for i in range(len(x)):
+        # the scale factor is looked up at log(t) like ascalef(t), so that
+        # both backends round alike at the edges of the emission window
+        tt = np.exp(x[i])
+        logtt = np.log(tt)
+        knot = locate(logtt, table)
+        if knot < 0:
+            out[i] = np.nan
+            continue
+        aratio = np.exp(log_scale_factor(logtt, knot, table)) / a0
+        lk = xi * k / f * aratio
+        # causality condition, the loops created at tt must be larger
+        if alpha * tt < lk:
+            continue
+        tk = ti_dwcs(tt, lk, Gmu, Rc, alpha, gamma, 1e-14, 100)
+        if tk == 0 or tk >= tstar:
+            continue
+        logtk = np.log(tk)
+        knotk = locate(logtk, table)
+        if knotk < 0:
+            out[i] = np.nan
+            continue
+        ak = np.exp(log_scale_factor(logtk, knotk, table)) / a0
+        Gammak = gamma_s(alpha * tk / (2 * np.pi * Rc), gamma)
+        out[i] = aratio**5 * F * ceff(tk, knotk, table, constants) / (alpha * tk**4.) * \
+                 (ak / aratio)**3 * (Pk * xi * k / f) * \
+                 (1. + xi * k / (2 * np.pi * Rc * f) * aratio) * \
+                 Gammak / (Gammak * Gmu + alpha * (1 + alpha * tk / (2 * np.pi * Rc))) * tt
+    return out
+
+# raise like the scale-factor lookup if a kernel left the table
+def checked(values):
+    if np.isnan(values).any():
+        raise ValueError('A value in t is outside the range of the scale factor table.')
+    return values
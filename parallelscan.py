@@ -0,0 +1,77 @@
+"""
+This script schedules the calculation of GW spectra over a pool of worker
+processes. The work is split into units of one frequency and a chunk of
+k-modes, and all the units of a spectrum are submitted to the pool at once,
+so that the workers stay busy through the whole run. Each worker receives a
+copy of the caller's defect object, with its settings, once when it starts,
+instead of receiving it with every task, and the partial k-sums are added
+up as they arrive.
+
+"""
+import multiprocessing
+import os
+import numpy as np
+
+worker_defect = None # defect object of the current worker process
+
+# single-mode methods with a companion method(*params, freq, kmax) giving the
+# largest k-mode that contributes at freq; higher modes are not calculated
+SUPPORT = {'OmegaGWcalcDWCS': 'kmaxDWCS'}
+
+# keep the defect object of a worker process; its cache connection is not
+# pickled, the worker opens its own
+def init_worker(defect, cache_path=None):
+    global worker_defect
+    worker_defect = defect
+    if cache_path is not None:
+        worker_defect.use_cache(cache_path)
+
+# one work unit: the sum of the k-modes in kchunk at the frequency freq.
+# method is the name of the defect method calculating a single k-mode,
+# called as method(*params, freq, k)
+def evaluate_chunk(task):
+    i, method, params, freq, kchunk = task
+    calc = getattr(worker_defect, method)
+    return i, sum(calc(*params, freq, k) for k in kchunk)
+
+# split the k-modes into chunks; by default there are about four chunks per
+# process for every frequency, which keeps the load balanced while the work
+# units stay large compared to the scheduling overhead
+def split_kmodes(klist, processes, kchunk=None):
+    klist = list(klist)
+    if kchunk is None:
+        kchunk = max(1, -(-len(klist) // (4 * processes)))
+    return [klist[start:start + kchunk] for start in range(0, len(klist), kchunk)]
+
+# largest contributing k-mode up to kmax at every frequency in flist, or kmax
+# everywhere if the method has no support information
+def contributing_kmax(defect, method, params, flist, kmax):
+    if method not in SUPPORT:
+        return [kmax] * len(flist)
+    support = getattr(defect, SUPPORT[method])
+    return [support(*params, freq, kmax) for freq in flist]
+
+# evaluate the GW spectrum for the frequency list flist, summing the k-modes
+# in klist. defect is a CosmicString or DWBoundedbyCS object, whose settings
+# (integration, background, cache, ...) the workers use, or the class for one
+# with the default settings; method is the name of its single-mode method
+# (e.g. 'OmegaGWcalcDWCS') and params the model parameters passed before the
+# frequency (e.g. (Lambda, v)). cache_path replaces the cache of the defect.
+def evaluate_parallel(defect, method, params, flist, klist, processes=None,
+                      kchunk=None, cache_path=None):
+    if processes is None:
+        processes = os.cpu_count()
+    if isinstance(defect, type):
+        defect = defect()
+    klist = list(klist)
+    kmax = contributing_kmax(defect, method, params, flist, max(klist))
+    # work units whose k-modes cannot contribute are not scheduled at all
+    tasks = [(i, method, tuple(params), freq, [k for k in kc if k <= kmax[i]])
+             for kc in split_kmodes(klist, processes, kchunk)
+             for i, freq in enumerate(flist) if min(kc) <= kmax[i]]
+    results = np.zeros(len(flist))
+    with multiprocessing.Pool(processes, initializer=init_worker,
+                              initargs=(defect, cache_path)) as pool:
+        for i, partial in pool.imap_unordered(evaluate_chunk, tasks):
+            results[i] += partial
+    return results
@@ -0,0 +1,185 @@
+"""
+This script implements a persistent on-disk cache for the GW amplitudes
+calculated by CosmicString.OmegaGWcalcCS and DWBoundedbyCS.OmegaGWcalcDWCS.
+
+Each cached value is one (Lambda, v, f, k) cell of a spectrum. The cells are
+grouped by a model key, which is a hash of the defect type, all the physical
+constants and settings stored on the defect instance, and the scale-factor
+table it uses (and how it is interpolated), so that changing any of them
+never returns a stale result. The values are kept in a single SQLite file,
+and once the number of stored cells exceeds max_entries the least recently
+used cells are evicted, down to nine tenths of max_entries.
+
+Re-running a scan with more frequencies or a higher kmax only calculates the
+cells that are not in the cache yet.
+
+"""
+import hashlib
+import json
+import numbers
+import os
+import sqlite3
+import time
+import numpy as np
+
+# hash of the defect type, the physical constants on the instance and the
+# scale-factor table, identifying the model the cached values belong to. The
+# backend is left out, the NumPy and compiled integrands agree to rounding.
+# overrides replace attributes of the instance, e.g. integration='trapezoid'
+# for the batched paths, which always use the trapezoid rule.
+def model_key(defect, **overrides):
+    constants = {name: float(value) if isinstance(value, numbers.Real) else value
+                 for name, value in sorted(dict(vars(defect), **overrides).items())
+                 if isinstance(value, (numbers.Real, str)) and not isinstance(value, bool)
+                 and name != 'backend'}
+    table = hashlib.sha256()
+    table.update(np.ascontiguousarray(defect.ax, dtype=float).tobytes())
+    table.update(np.ascontiguousarray(defect.ay, dtype=float).tobytes())
+    description = json.dumps([type(defect).__name__, constants, type(defect.ascalef).__name__,
+                              table.hexdigest()])
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+class ResultCache:
+    def __init__(self, path='OmegaGW_cache.sqlite', max_entries=10000000):
+        self.path = os.path.abspath(path)
+        self.max_entries = max_entries
+        self.connection = None
+        self.count = 0 # upper bound on the number of stored cells
+    
+    # the connection is not pickled, so that defect instances carrying a cache
+    # can still be sent to worker processes; each process opens its own
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['connection'] = None
+        return state
+    
+    def connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, timeout=60)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS omegagw ('
+                                    'model TEXT, Lambda REAL, v REAL, f REAL, k REAL, '
+                                    'value REAL, used REAL, '
+                                    'PRIMARY KEY (model, Lambda, v, f, k)) WITHOUT ROWID')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS omegagw_used ON omegagw (used)')
+            self.count = self.connection.execute('SELECT COUNT(*) FROM omegagw').fetchone()[0]
+        return self.connection
+    
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+    
+    # return a dictionary {(f, k): value} of the cached cells among all pairs
+    # of frequencies in flist and k-modes in klist
+    def get_many(self, model, Lambda, v, flist, klist):
+        connection = self.connect()
+        flist = [float(freq) for freq in flist]
+        klist = [float(k) for k in klist]
+        found = {}
+        for start in range(0, len(klist), 500):
+            kchunk = klist[start:start + 500]
+            rows = connection.execute(
+                'SELECT f, k, value FROM omegagw WHERE model = ? AND Lambda = ? AND v = ? '
+                'AND k IN (%s)' % ','.join('?' * len(kchunk)),
+                [model, float(Lambda), float(v)] + kchunk).fetchall()
+            found.update(((freq, k), value) for freq, k, value in rows)
+        fset = set(flist)
+        found = {key: value for key, value in found.items() if key[0] in fset}
+        if found:
+            now = time.time()
+            with connection:
+                connection.executemany(
+                    'UPDATE omegagw SET used = ? WHERE model = ? AND Lambda = ? AND v = ? AND f = ? AND k = ?',
+                    [(now, model, float(Lambda), float(v), freq, k) for freq, k in found])
+        return found
+    
+    def get(self, model, Lambda, v, freq, k):
+        connection = self.connect()
+        key = (model, float(Lambda), float(v), float(freq), float(k))
+        row = connection.execute('SELECT value FROM omegagw WHERE model = ? AND Lambda = ? '
+                                 'AND v = ? AND f = ? AND k = ?', key).fetchone()
+        if row is None:
+            return None
+        with connection:
+            connection.execute('UPDATE omegagw SET used = ? WHERE model = ? AND Lambda = ? '
+                               'AND v = ? AND f = ? AND k = ?', (time.time(),) + key)
+        return row[0]
+    
+    # store the values {(f, k): value} and, once they are committed, evict the
+    # least recently used cells if the cache has grown beyond max_entries
+    def put_many(self, model, Lambda, v, values):
+        connection = self.connect()
+        now = time.time()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO omegagw VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(model, float(Lambda), float(v), float(freq), float(k), float(value), now)
+                 for (freq, k), value in values.items()])
+        self.count += len(values)
+        if self.count > self.max_entries:
+            self.evict()
+    
+    def put(self, model, Lambda, v, freq, k, value):
+        self.put_many(model, Lambda, v, {(freq, k): value})
+    
+    # if the cache holds more than max_entries cells, delete the least recently
+    # used ones down to nine tenths of max_entries, so that eviction does not
+    # run on every insert. The cells of the batch just written are the most
+    # recently used, so they are only evicted if the batch alone exceeds that
+    # bound.
+    def evict(self):
+        connection = self.connect()
+        self.count = connection.execute('SELECT COUNT(*) FROM omegagw').fetchone()[0]
+        if self.count > self.max_entries:
+            excess = self.count - (self.max_entries - self.max_entries // 10)
+            with connection:
+                connection.execute('DELETE FROM omegagw WHERE (model, Lambda, v, f, k) IN '
+                                   '(SELECT model, Lambda, v, f, k FROM omegagw '
+                                   'ORDER BY used LIMIT ?)', (excess,))
+            self.count = connection.execute('SELECT COUNT(*) FROM omegagw').fetchone()[0]
+
+# return the table of GW amplitudes for all pairs of frequencies in flist and
+# k-modes in klist, taking the cached cells from the cache and calculating
+# only the missing ones with compute(fsub, ksub), which must return an array
+# of shape (len(fsub), len(ksub))
+def cached_table(cache, model, Lambda, v, flist, klist, compute):
+    flist = np.atleast_1d(np.asarray(flist, dtype=float))
+    klist = np.atleast_1d(np.asarray(klist, dtype=float))
+    found = cache.get_many(model, Lambda, v, flist, klist)
+    table = np.array([[found.get((freq, k), np.nan) for k in klist] for freq in flist]).reshape(len(flist), len(klist))
+    missing = np.isnan(table)
+    if missing.any():
+        rows = np.nonzero(missing.any(axis=1))[0]
+        cols = np.nonzero(missing.any(axis=0))[0]
+        computed = compute(flist[rows], klist[cols])
+        new = {}
+        for a, i in enumerate(rows):
+            for b, j in enumerate(cols):
+                if missing[i, j]:
+                    table[i, j] = computed[a, b]
+                    new[(flist[i], klist[j])] = computed[a, b]
+        cache.put_many(model, Lambda, v, new)
+    return table
+
+# the (point, f, k) table of the points (Lambda[p], v[p]) from the cache,
+# calling compute(points) -> (len(points), len(flist), len(klist)) once for
+# all the points with missing cells and storing the cells it adds
+def cached_grid(cache, model, Lambda, v, flist, klist, compute):
+    flist = np.atleast_1d(np.asarray(flist, dtype=float))
+    klist = np.atleast_1d(np.asarray(klist, dtype=float))
+    table = np.full((len(Lambda), len(flist), len(klist)), np.nan)
+    for p in range(len(Lambda)):
+        found = cache.get_many(model, Lambda[p], v[p], flist, klist)
+        table[p] = [[found.get((freq, k), np.nan) for k in klist] for freq in flist]
+    missing = np.isnan(table)
+    points = np.nonzero(missing.any(axis=(1, 2)))[0]
+    if len(points):
+        computed = compute(points)
+        for a, p in enumerate(points):
+            cells = np.nonzero(missing[p])
+            table[p][cells] = computed[a][cells]
+            cache.put_many(model, Lambda[p], v[p],
+                           {(flist[i], klist[j]): computed[a, i, j] for i, j in zip(*cells)})
+    return table
@@ -8,21 +8,24 @@ import numpy as np
 import warnings
 import os
 from snrgeneric import snr_all_interferometers
-# Suppress all warnings
-warnings.filterwarnings("ignore") 
+import spectrumstore
 
 # Get the current working directory
 current_dir = os.getcwd()
 
+# store to take the spectra from instead of the text files, e.g. 'DWCSGW_store'
+# for new scans, see spectrumstore.load_spectrum
+store_path = None
+
 # Load and plot the pre-calculated GW spectrum.
 
 # GW spectrum for U(1) breaking at 10^{15} GeV, Z2 breaking at 246 GeV
 def get_Lambda15():
     # Define the name of the folder containing the data
     folder_name = '2hdmGWdata'
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_15.0_246.0.txt')
-    data = np.loadtxt(file_path)
+    data = spectrumstore.load_spectrum(file_path, store_path)
     
     # separate the columns
     freq = data[:, 0]
@@ -39,9 +42,9 @@ def get_Lambda15():
 def get_Lambda14():
     # Define the name of the folder containing the data
     folder_name = '2hdmGWdata'
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_14.0_246.0.txt')
-    data = np.loadtxt(file_path)
+    data = spectrumstore.load_spectrum(file_path, store_path)
     
     # separate the columns
     freq = data[:, 0]
@@ -58,9 +61,9 @@ def get_Lambda14():
 def get_Lambda13():
     # Define the name of the folder containing the data
     folder_name = '2hdmGWdata'
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_13.0_246.0.txt')
-    data = np.loadtxt(file_path)
+    data = spectrumstore.load_spectrum(file_path, store_path)
     
     # separate the columns
     freq = data[:, 0]
@@ -77,9 +80,9 @@ def get_Lambda13():
 def get_Lambda12():
     # Define the name of the folder containing the data
     folder_name = '2hdmGWdata'
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, folder_name, 'DWCSGW_12.0_246.0.txt')
-    data = np.loadtxt(file_path)
+    data = spectrumstore.load_spectrum(file_path, store_path)
     
     # separate the columns
     freq = data[:, 0]
@@ -94,19 +97,18 @@ def get_Lambda12():
     
 
 # Now calculate SNR     
-f_list, Omega_list = get_Lambda12()
-print("SNR for $v = 10^{12}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
-
-f_list, Omega_list = get_Lambda13()
-print("SNR for $v = 10^{13}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
-
-f_list, Omega_list = get_Lambda14()
-print("SNR for $v = 10^{14}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
-f_list, Omega_list = get_Lambda15()
-print("SNR for $v = 10^{15}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
-
-f_list, Omega_list = get_Lambda15()
-print("SNR for $v = 10^{15}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
+def print_snr():
+    f_list, Omega_list = get_Lambda12()
+    print("SNR for $v = 10^{12}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
+    
+    f_list, Omega_list = get_Lambda13()
+    print("SNR for $v = 10^{13}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
+    
+    f_list, Omega_list = get_Lambda14()
+    print("SNR for $v = 10^{14}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
+    
+    f_list, Omega_list = get_Lambda15()
+    print("SNR for $v = 10^{15}$ GeV \n", snr_all_interferometers(f_list, Omega_list))
 
 
 """
@@ -167,18 +169,30 @@ def dictionaries_to_latex_table(*dictionaries):
 
     return table
 
-# Example dictionaries
-f_list, Omega_list = get_Lambda12()
-dict1 = snr_all_interferometers(f_list, Omega_list)
-f_list, Omega_list = get_Lambda13()
-dict2 = snr_all_interferometers(f_list, Omega_list)
-f_list, Omega_list = get_Lambda14()
-dict3 = snr_all_interferometers(f_list, Omega_list)
-f_list, Omega_list = get_Lambda15()
-dict4 = snr_all_interferometers(f_list, Omega_list)
-
-# Convert dictionaries to LaTeX table
-latex_table = dictionaries_to_latex_table(dict1, dict2, dict3, dict4)
-
-# Print LaTeX table
-print(latex_table)
\ No newline at end of file
+# the table of the SNR of all four spectra
+def print_latex_table():
+    # Example dictionaries
+    f_list, Omega_list = get_Lambda12()
+    dict1 = snr_all_interferometers(f_list, Omega_list)
+    f_list, Omega_list = get_Lambda13()
+    dict2 = snr_all_interferometers(f_list, Omega_list)
+    f_list, Omega_list = get_Lambda14()
+    dict3 = snr_all_interferometers(f_list, Omega_list)
+    f_list, Omega_list = get_Lambda15()
+    dict4 = snr_all_interferometers(f_list, Omega_list)
+    
+    # Convert dictionaries to LaTeX table
+    latex_table = dictionaries_to_latex_table(dict1, dict2, dict3, dict4)
+    
+    # Print LaTeX table
+    print(latex_table)
+
+# print the SNR of all four spectra and their LaTeX table
+def main():
+    # Suppress all warnings
+    warnings.filterwarnings("ignore") 
+    print_snr()
+    print_latex_table()
+
+if __name__ == "__main__":
+    main()
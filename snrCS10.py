@@ -2,21 +2,24 @@ import numpy as np
 import warnings
 import os
 from snrgeneric import snr_LISA
-from GWplotter import plot_all_interferometers
+import spectrumstore
+from plotinterferometer import plot_all_interferometers
 import matplotlib.pyplot as plt
-# Suppress all warnings
-warnings.filterwarnings("ignore") 
 
 # Get the current working directory
 current_dir = os.getcwd()
 
+# store to take the spectrum from instead of the text file, e.g. 'CSGW_store',
+# see spectrumstore.load_spectrum
+store_path = None
+
 # Load and plot the pre-calculated GW spectrum.
 
 # GW spectrum for U(1) breaking at 10^{15} GeV, Z2 breaking at 246 GeV
 def get_CS_Lambda10():
-    # Load the data from the text file
+    # Load the data from the text file, or from the store if one is set
     file_path = os.path.join(current_dir, 'CSGW_10.0.txt')
-    data = np.loadtxt(file_path)
+    data = spectrumstore.load_spectrum(file_path, store_path)
     
     # separate the columns
     freq = data[:, 0]
@@ -29,9 +32,17 @@ def get_CS_Lambda10():
     
     return freq_nonzero, OmegaGW_nonzero
     
-f_list, Omega_list = get_CS_Lambda10()
-print("SNR for $v = 10^{10}$ GeV \n", snr_LISA(f_list, Omega_list))
+# print the LISA SNR and plot the spectrum with the interferometers
+def main():
+    # Suppress all warnings
+    warnings.filterwarnings("ignore") 
+    
+    f_list, Omega_list = get_CS_Lambda10()
+    print("SNR for $v = 10^{10}$ GeV \n", snr_LISA(f_list, Omega_list))
+    
+    plt.loglog(f_list, Omega_list, color='purple', linewidth=2.2, linestyle='-')
+    plot_all_interferometers()
+    plt.show()
 
-plt.loglog(f_list, Omega_list, color='purple', linewidth=2.2, linestyle='-')
-plot_all_interferometers()
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
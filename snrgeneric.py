@@ -2,169 +2,221 @@
 This script calculates the signal-to-noise ratio (SNR) for various interferometers.
 """
 import numpy as np
-from scipy.interpolate import interp1d
-from scipy.integrate import quad
-import warnings
-import os
-# Suppress all warnings
-warnings.filterwarnings("ignore")
+import detectors
 
 
-# Get the current working directory
-current_dir = os.getcwd()
+# interpolate the GW signal Omega_list(f_list) at the frequencies f (any
+# shape) in log-log space, in one batched call. The signal is zero outside
+# [f_list[0], f_list[-1]] and between samples where it vanishes.
+def signal_interp(f, f_list, Omega_list):
+    f_list = np.asarray(f_list, dtype=float)
+    Omega_list = np.asarray(Omega_list, dtype=float)
+    logf = np.log10(f)
+    positive = Omega_list > 0
+    logOmega = np.log10(np.where(positive, Omega_list, 1.))
+    both_positive = np.interp(logf, np.log10(f_list), positive.astype(float)) == 1.
+    inside = (f >= f_list[0]) & (f <= f_list[-1])
+    return np.where(inside & both_positive, 10**np.interp(logf, np.log10(f_list), logOmega), 0.)
 
-def snr_calculator(f_list, Omega_list, Interf):
-    # Interpolate the interferometer data 
+# integral over f along the last axis of the log-log interpolation of y(f),
+# exact for the power law between neighbouring points, see powerlaw_segments
+def powerlaw_integral(f, y):
+    return np.sum(powerlaw_segments(f, y), axis=-1)
+
+# log-log grid of npoints frequencies over the sensitivity curve Interf and
+# the sensitivity on it
+def detector_grid(Interf, npoints=100):
     f_interf = Interf[:, 0]
-    Omega_interf = Interf[:, 1]  
-    log_interp = interp1d(np.log10(f_interf), np.log10(Omega_interf))
-    def Omega_interf_int(freq):
-        return 10**log_interp(np.log10(freq))
-    
-    # new grid
-    f_new_list = np.logspace(np.log10(1.00001*f_interf[0]), np.log10(0.9999*f_interf[-1]), 100)
-        
-    Omega_interf_new_list = np.array([float(Omega_interf_int(freq)) for freq in f_new_list])
-       
-    # interpolate the GW signal data
-    Omega_interp = interp1d(np.log10(f_list), np.log10(Omega_list))
-    def Omega_signal(freq):
-        if freq < f_list[0] or freq > f_list[-1]:
-            return 0
-        else:
-            return 10**Omega_interp(np.log10(freq))
-    Omega_signal_new_list = np.array([float(Omega_signal(freq)) for freq in f_new_list])
-    
-    # calculate snr
-    log_snr_integrand = interp1d(np.log10(f_new_list), np.log10((Omega_signal_new_list / Omega_interf_new_list)**2))
-    def snr_integrand(freq):
-        return 10**log_snr_integrand(np.log10(freq))
-    
-    integral, error = quad(snr_integrand, f_new_list[0], f_new_list[-1], limit=100)
+    Omega_interf = Interf[:, 1]
+    f_new_list = np.logspace(np.log10(1.00001*f_interf[0]), np.log10(0.9999*f_interf[-1]), npoints)
+    Omega_interf_new_list = 10**np.interp(np.log10(f_new_list), np.log10(f_interf), np.log10(Omega_interf))
+    return f_new_list, Omega_interf_new_list
 
-    snr = np.sqrt(4 * integral)
-    
-    return snr
+# SNR for a batch of detectors at once: f_grids and Omega_grids are arrays of
+# shape (n_detectors, npoints) from detector_grid. The signal is interpolated
+# on all the grids in one call and integrated with array quadrature.
+def snr_integrated(f_list, Omega_list, f_grids, Omega_grids):
+    Omega_signal = signal_interp(f_grids, f_list, Omega_list)
+    return np.sqrt(4 * powerlaw_integral(f_grids, (Omega_signal / Omega_grids)**2))
+
+# SNR from binned sensitivity data, summing over the detector frequencies.
+# The signal is interpolated linearly and is zero outside its range.
+def snr_summed(f_list, Omega_list, f_interf, Omega_interf):
+    Omega_interp_list = np.interp(f_interf, f_list, Omega_list, left=0., right=0.)
+    return np.sqrt(4 * np.sum((Omega_interp_list / Omega_interf)**2))
+
+def snr_calculator(f_list, Omega_list, Interf):
+    f_new_list, Omega_interf_new_list = detector_grid(Interf)
+    return snr_integrated(f_list, Omega_list, f_new_list[None, :], Omega_interf_new_list[None, :])[0]
+
+# SNR of the detector called name, see detectors.py
+def snr_detector(name, f_list, Omega_list):
+    det = detectors.detector(name)
+    if det.entry['snr'] == 'summed':
+        return snr_summed(f_list, Omega_list, det.f, det.Omega)
+    return snr_calculator(f_list, Omega_list, np.column_stack((det.f, det.Omega)))
 
 def snr_LISA(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'LISApoints.csv')
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
-    
+    return snr_detector('LISA', f_list, Omega_list)
 
 def snr_BBO(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'BBO.csv')
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('BBO', f_list, Omega_list)
 
 def snr_DECIGO(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'Decigo.csv')     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('DECIGO', f_list, Omega_list)
 
 def snr_ET(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'ETlist.csv')     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('ET', f_list, Omega_list)
 
 def snr_AION(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'AION.csv')     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('AION', f_list, Omega_list)
 
 def snr_AEDGE(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'AEDGE.csv')     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('AEDGE', f_list, Omega_list)
 
 def snr_CE(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'CE.csv')     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('CE', f_list, Omega_list)
 
 def snr_MuARES(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'MuARES.csv')
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    return snr_calculator(f_list, Omega_list, Interf)
+    return snr_detector('MuARES', f_list, Omega_list)
 
 def snr_Aplus(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'Aplusdesignsensitivity.csv')
-    
-     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    f_interf = Interf[:, 0]
-    Omega_interf = 0.7**2 *Interf[:, 1]
-    Omega_interp = interp1d(f_list, Omega_list)
-    def Omega_int(freq):
-        if freq < f_list[0] or freq > f_list[-1]:
-            return 0
-        else:
-            return Omega_interp(freq)
-    Omega_interp_list = [Omega_int(freq) for freq in f_interf]
-    
-    snr = np.sqrt(4 * sum((Omega_interp_list / Omega_interf)**2))
-    
-    return snr
+    return snr_detector('Aplus', f_list, Omega_list)
 
 def snr_LV(f_list, Omega_list):
-    # Define the name of the folder containing the data
-    folder_name = 'Interferometer data'
-    # Construct the path to the data file inside the folder
-    Interf_path = os.path.join(current_dir, folder_name, 'LIGOVIRGOdesignsensitivity.csv')
+    return snr_detector('HLV', f_list, Omega_list)
+
+# linear interpolation from the points x to the points xnew as a matrix M of
+# shape (len(x), len(xnew)), so that y @ M interpolates y. Columns of xnew
+# outside [x[0], x[-1]] are zero.
+def interp_matrix(x, xnew):
+    M = np.zeros((len(x), len(xnew)))
+    inside = np.nonzero((xnew >= x[0]) & (xnew <= x[-1]))[0]
+    if len(x) == 1:
+        M[0, inside] = 1.
+        return M
+    i = np.clip(np.searchsorted(x, xnew[inside], side='right') - 1, 0, len(x) - 2)
+    w = (xnew[inside] - x[i]) / (x[i + 1] - x[i])
+    M[i, inside] = 1 - w
+    M[i + 1, inside] += w
+    return M
+
+# the detector side of the SNR calculation for the detectors in names, done
+# once and shared by every spectrum: the log-log grids of all integrated
+# detectors concatenated, the bins of all summed detectors concatenated, and
+# the matrices summing the contributions of each detector
+class DetectorGrids:
+    def __init__(self, names, npoints=100):
+        self.names = list(names)
+        f_grids, Omega_grids, grid_columns = [], [], []
+        f_bins, Omega_bins, bin_columns = [], [], []
+        for column, name in enumerate(self.names):
+            det = detectors.detector(name)
+            if det.entry['snr'] == 'summed':
+                f_bins.append(det.f)
+                Omega_bins.append(det.Omega)
+                bin_columns.append(np.full(len(det.f), column))
+            else:
+                f_grid, Omega_grid = detector_grid(np.column_stack((det.f, det.Omega)), npoints)
+                f_grids.append(f_grid)
+                Omega_grids.append(Omega_grid)
+                grid_columns.append(np.full(npoints, column))
+        self.f_grid = np.concatenate(f_grids) if f_grids else np.zeros(0)
+        self.logf_grid = np.log10(self.f_grid)
+        self.noise2_grid = np.concatenate(Omega_grids)**2 if f_grids else np.zeros(0)
+        columns = np.concatenate(grid_columns) if f_grids else np.zeros(0, dtype=int)
+        # interval i between grid points i and i+1 counts for its detector,
+        # unless it joins the grids of two detectors
+        self.interval_sum = np.zeros((max(len(self.f_grid) - 1, 0), len(self.names)))
+        same = columns[:-1] == columns[1:]
+        self.interval_sum[np.nonzero(same)[0], columns[:-1][same]] = 4.
+        self.f_bins = np.concatenate(f_bins) if f_bins else np.zeros(0)
+        self.noise2_bins = np.concatenate(Omega_bins)**2 if f_bins else np.zeros(0)
+        columns = np.concatenate(bin_columns) if f_bins else np.zeros(0, dtype=int)
+        self.bin_sum = np.zeros((len(self.f_bins), len(self.names)))
+        self.bin_sum[np.arange(len(self.f_bins)), columns] = 4.
     
-     
-    Interf = np.genfromtxt(Interf_path, delimiter=',')
-    f_interf = Interf[:, 0]
-    Omega_interf = 0.7**2 *Interf[:, 1]
-    Omega_interp = interp1d(f_list, Omega_list)
-    def Omega_int(freq):
-        if freq < f_list[0] or freq > f_list[-1]:
-            return 0
-        else:
-            return Omega_interp(freq)
-    Omega_interp_list = [Omega_int(freq) for freq in f_interf]
+    # squared SNR matrix (len(Omega), len(names)) from the signal on the
+    # grids (Omega_grid) and on the bins (Omega_bins), one row per spectrum
+    def snr2(self, Omega_grid, Omega_bins):
+        snr2 = (powerlaw_segments(self.f_grid, Omega_grid**2 / self.noise2_grid) @ self.interval_sum)
+        snr2 += (Omega_bins**2 / self.noise2_bins) @ self.bin_sum
+        return snr2
     
-    snr = np.sqrt(4 * sum((Omega_interp_list / Omega_interf)**2))
+    # the signal of the spectra Omega_array, all sampled at the frequencies
+    # f_list, on the grids and on the bins, by matrix products
+    def signal_shared(self, f_list, Omega_array):
+        logf_list = np.log10(f_list)
+        positive = Omega_array > 0
+        # log10 of a vanishing signal is replaced by a huge negative number, so
+        # that any interpolation weight on it gives 10**(...) = 0 like the
+        # interval-wise rule of signal_interp; an exact zero weight leaves the
+        # neighbour untouched
+        logOmega = np.where(positive, np.log10(np.where(positive, Omega_array, 1.)), -1e300)
+        inside = (self.f_grid >= f_list[0]) & (self.f_grid <= f_list[-1])
+        Omega_grid = np.where(inside, 10**(logOmega @ interp_matrix(logf_list, self.logf_grid)), 0.)
+        Omega_bins = Omega_array @ interp_matrix(f_list, self.f_bins)
+        return Omega_grid, Omega_bins
     
-    return snr
+    # the same for spectra with their own frequencies, f_array[i] for Omega_array[i]
+    def signal_separate(self, f_array, Omega_array):
+        Omega_grid = np.array([signal_interp(self.f_grid, f, Omega) for f, Omega in zip(f_array, Omega_array)])
+        Omega_bins = np.array([np.interp(self.f_bins, f, Omega, left=0., right=0.) for f, Omega in zip(f_array, Omega_array)])
+        return Omega_grid.reshape(len(Omega_array), -1), Omega_bins.reshape(len(Omega_array), -1)
+
+# integral of the log-log interpolation of y(f) over each interval between
+# neighbouring points of f, along the last axis of y. Intervals where y
+# vanishes at one end do not contribute. Both branches of the np.where are
+# evaluated, so the floating-point warnings of the discarded one are
+# silenced here, and only here.
+def powerlaw_segments(f, y):
+    f0, f1 = f[..., :-1], f[..., 1:]
+    y0, y1 = y[..., :-1], y[..., 1:]
+    valid = (y0 > 0) & (y1 > 0)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        ratio = f1 / f0
+        p = np.log(np.where(valid, y1, 1.) / np.where(valid, y0, 1.)) / np.log(ratio)
+        p1 = p + 1
+        near_minus_one = np.abs(p1) < 1e-10
+        segment = np.where(near_minus_one, np.log(ratio),
+                           np.expm1(p1 * np.log(ratio)) / np.where(near_minus_one, 1., p1))
+        return np.where(valid, y0 * f0 * segment, 0.)
+
+# detector grids already prepared in this process
+prepared = {}
+
+def detector_grids(names=None, npoints=100):
+    names = tuple(detectors.snr_names if names is None else names)
+    if (names, npoints) not in prepared:
+        prepared[(names, npoints)] = DetectorGrids(names, npoints)
+    return prepared[(names, npoints)]
+
+# SNR matrix of shape (N_spectra, N_detectors) for many spectra at once.
+# Omega_array is (N_spectra, n) and f_list is either the n frequencies shared
+# by all spectra or an (N_spectra, n) array of their own frequencies. The
+# columns follow names (default detectors.snr_names). The detector side is
+# prepared once per process, see DetectorGrids.
+def snr_matrix(f_list, Omega_array, names=None):
+    grids = detector_grids(names)
+    f_list = np.asarray(f_list, dtype=float)
+    Omega_array = np.atleast_2d(np.asarray(Omega_array, dtype=float))
+    if f_list.ndim == 1:
+        Omega_grid, Omega_bins = grids.signal_shared(f_list, Omega_array)
+    else:
+        Omega_grid, Omega_bins = grids.signal_separate(f_list, Omega_array)
+    return np.sqrt(grids.snr2(Omega_grid, Omega_bins))
+
+# SNR for all detectors in detectors.snr_names in a single pass, see
+# snr_matrix. Returns a structured array with one field snr_<name> per
+# detector, unrounded.
+def snr_interferometers(f_list, Omega_list):
+    snr = snr_matrix(f_list, Omega_list)[0]
+    result = np.zeros((), dtype=[('snr_' + name, float) for name in detectors.snr_names])
+    for name, value in zip(detectors.snr_names, snr):
+        result['snr_' + name] = value
+    return result
 
 def snr_all_interferometers(f_list, Omega_list):
-    snr_dict = {'snr_MuARES': round(snr_MuARES(f_list, Omega_list), 2),
-                'snr_LISA': round(snr_LISA(f_list, Omega_list), 2),
-                'snr_BBO': round(snr_BBO(f_list, Omega_list), 2),
-                'snr_DECIGO': round(snr_DECIGO(f_list, Omega_list), 2),
-                'snr_AION': round(snr_AION(f_list, Omega_list), 2),
-                'snr_AEDGE': round(snr_AEDGE(f_list, Omega_list), 2),
-                'snr_ET': round(snr_ET(f_list, Omega_list), 2),
-                'snr_CE': round(snr_CE(f_list, Omega_list), 2),
-                'snr_Aplus': round(snr_Aplus(f_list, Omega_list), 2),
-                'snr_HLV': round(snr_LV(f_list, Omega_list), 2)
-                }
-    return snr_dict
\ No newline at end of file
+    snr = snr_interferometers(f_list, Omega_list)
+    snr_dict = {name: round(float(snr[name]), 2) for name in snr.dtype.names}
+    return snr_dict
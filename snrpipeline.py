@@ -0,0 +1,92 @@
+"""
+This script streams GW spectra from a parameter scan straight into the SNR
+calculation, without writing the spectra to text files in between.
+
+The pipeline is a chain of generators:
+
+    spectra(defect, grid, flist, kmax)   yields (params, Omega) per grid point
+    snr_stream(spectra, flist)           adds the SNR of every detector
+    a sink, e.g. collect_snr or write_snr_csv, consumes the stream
+
+Only batch spectra are held at any time, so the memory use does not grow
+with the size of the grid. For example
+
+    from dwboundedbycs import DWBoundedbyCS
+    grid = [(Lambda, 246.) for Lambda in np.logspace(12, 15, 31)]
+    stream = snr_stream(spectra(DWBoundedbyCS(), grid, flist, 10000), flist)
+    write_snr_csv(stream, 'snr_scan.csv')
+
+"""
+import numpy as np
+import snrgeneric
+import detectors
+
+# the methods of the defect classes giving the k-summed spectrum from the
+# fundamental mode (resum) and the single-mode amplitude
+METHODS = {'CosmicString': ('OmegaGWresumCS', 'OmegaGWcalcCS'),
+           'DWBoundedbyCS': ('OmegaGWresumDWCS', 'OmegaGWcalcDWCS')}
+
+# GW spectra of defect on the frequencies flist, summed over the k-modes
+# from 1 to kmax, for every parameter tuple in grid ((Lambda,) for
+# CosmicString, (Lambda, v) for DWBoundedbyCS). Yields (params, Omega) as
+# soon as each spectrum is finished. With resum the k-sum is built from the
+# fundamental mode, see kmodesum.py; otherwise every mode is integrated.
+def spectra(defect, grid, flist, kmax, resum=True):
+    resum_method, single_method = METHODS[type(defect).__name__]
+    flist = np.asarray(flist, dtype=float)
+    for params in grid:
+        params = tuple(params)
+        if resum:
+            Omega = getattr(defect, resum_method)(*params, flist, kmax)
+        elif hasattr(defect, 'OmegaGWspectrumCS'):
+            Omega = defect.OmegaGWspectrumCS(*params, flist, range(1, kmax + 1))
+        else:
+            calc = getattr(defect, single_method)
+            Omega = np.array([sum(calc(*params, freq, k) for k in range(1, kmax + 1)) for freq in flist])
+        yield params, Omega
+
+# add the SNR to a stream of (params, Omega) on the shared frequencies flist.
+# The spectra are evaluated in batches of batch spectra with
+# snrgeneric.snr_matrix. Yields (params, Omega, snr) with snr one value per
+# detector in names (default detectors.snr_names).
+def snr_stream(stream, flist, names=None, batch=64):
+    flist = np.asarray(flist, dtype=float)
+    pending = []
+    for params, Omega in stream:
+        pending.append((params, Omega))
+        if len(pending) == batch:
+            yield from snr_batch(pending, flist, names)
+            pending = []
+    if pending:
+        yield from snr_batch(pending, flist, names)
+
+def snr_batch(pending, flist, names):
+    snr = snrgeneric.snr_matrix(flist, np.array([Omega for _, Omega in pending]), names)
+    for (params, Omega), row in zip(pending, snr):
+        yield params, Omega, row
+
+# sink keeping only the parameters and the SNRs; returns the arrays
+# (N_points, N_params) and (N_points, N_detectors)
+def collect_snr(stream):
+    params, snr = [], []
+    for p, _, row in stream:
+        params.append(p)
+        snr.append(row)
+    return np.array(params), np.array(snr)
+
+# sink writing one line per parameter point to a csv file as the results
+# arrive, with the parameters (named Lambda and v unless param_names is
+# given) followed by the SNR of every detector. Returns the number of points
+# written.
+def write_snr_csv(stream, path, param_names=None, names=None):
+    names = detectors.snr_names if names is None else names
+    count = 0
+    with open(path, 'w') as file:
+        for params, _, row in stream:
+            if count == 0:
+                pnames = ('Lambda', 'v')[:len(params)] if param_names is None else param_names
+                file.write(','.join(list(pnames) + ['snr_' + name for name in names]) + '\n')
+            file.write(','.join(repr(float(x)) for x in list(params) + list(row)) + '\n')
+            file.flush()
+            count += 1
+    return count
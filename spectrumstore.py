@@ -0,0 +1,276 @@
+"""
+This script keeps the GW spectra of a scan in one binary store instead of
+one text file per parameter point.
+
+A store is a directory holding the spectra in chunks of binary .npy files,
+column by column, and a description of the chunks in store.json:
+
+    store_dir/store.json                 parameter columns and chunks
+    store_dir/chunk_<n>_<host>_<pid>.params.npy    (n, len(columns)) parameter values
+    store_dir/chunk_<n>_<host>_<pid>.f.npy         frequencies shared by the chunk
+    store_dir/chunk_<n>_<host>_<pid>.Omega.npy     (n, len(f)) spectra
+
+The chunks are read as memory-mapped arrays, so loading the spectra of one
+chunk does not copy them. Every parameter column is indexed by sorting it,
+so that a selection such as
+
+    store.select(v=246., Lambda=(1e12, 1e15))
+
+is a binary search per column. The store is written by appending spectra,
+e.g. from snrpipeline.spectra through write_store, and the existing text
+files can be converted with import_text (and back with export_text).
+
+Several processes, e.g. one cluster job per Lambda, can append to the same
+store: a chunk is added under a lock on store_dir/store.lock, after reading
+the chunks the other writers have added in the meantime, and the chunk files
+are named after the host and process writing them, so that they never
+overwrite each other.
+
+"""
+import contextlib
+import fcntl
+import json
+import os
+import re
+import socket
+import numpy as np
+import atomicfiles
+
+class SpectrumStore:
+    # open the store at path, creating it with the parameter columns if it
+    # does not exist. Spectra are written in chunks of up to chunk_size rows.
+    def __init__(self, path, columns=('Lambda', 'v'), chunk_size=1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        spec_path = os.path.join(path, 'store.json')
+        if os.path.exists(spec_path):
+            with open(spec_path) as file:
+                self.spec = json.load(file)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.spec = {'columns': list(columns), 'chunks': []}
+            self.write_spec()
+        self.columns = self.spec['columns']
+        self.pending = [] # rows not yet written
+        self.pending_f = None
+        self.index = None # built on the first selection
+        self.arrays = {} # memory-mapped chunk arrays
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self):
+        return sum(chunk['rows'] for chunk in self.spec['chunks']) + len(self.pending)
+
+    # add the spectrum Omega on the frequencies f with the parameter values
+    # params, in the order of the columns
+    def append(self, params, f, Omega):
+        params = np.asarray(params, dtype=float).reshape(-1)
+        if len(params) != len(self.columns):
+            raise ValueError(f'expected values for {self.columns}, got {len(params)}')
+        f = np.asarray(f, dtype=float)
+        if self.pending and (len(f) != len(self.pending_f) or not np.array_equal(f, self.pending_f)):
+            self.flush() # a chunk shares its frequencies
+        self.pending_f = f
+        self.pending.append((params, np.array(Omega, dtype=float)))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    # write the pending rows as a new chunk. The chunks added by other
+    # writers since the store was read are read first, under the lock, so
+    # that the new chunk is added to them instead of replacing them.
+    def flush(self):
+        if not self.pending:
+            return
+        with self.locked():
+            self.reload()
+            name = f"chunk_{len(self.spec['chunks']):06d}_{socket.gethostname()}_{os.getpid()}"
+            atomicfiles.save_array(os.path.join(self.path, name + '.params.npy'), np.array([p for p, _ in self.pending]))
+            atomicfiles.save_array(os.path.join(self.path, name + '.f.npy'), self.pending_f)
+            atomicfiles.save_array(os.path.join(self.path, name + '.Omega.npy'), np.array([Omega for _, Omega in self.pending]))
+            # the chunk only becomes part of the store once it is listed
+            self.spec['chunks'].append({'name': name, 'rows': len(self.pending)})
+            self.write_spec()
+        self.pending = []
+        self.index = None
+
+    # hold the lock of the store for the with block. Where the filesystem
+    # does not support flock, the writers still never share chunk files.
+    @contextlib.contextmanager
+    def locked(self):
+        with open(os.path.join(self.path, 'store.lock'), 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except OSError:
+                pass
+            yield
+
+    # read the chunks added by other writers
+    def reload(self):
+        with open(os.path.join(self.path, 'store.json')) as file:
+            chunks = json.load(file)['chunks']
+        if len(chunks) != len(self.spec['chunks']):
+            self.spec['chunks'] = chunks
+            self.index = None
+
+    def write_spec(self):
+        spec_path = os.path.join(self.path, 'store.json')
+        tmp_path = f'{spec_path}.{socket.gethostname()}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.spec, file)
+        os.replace(tmp_path, spec_path)
+
+    # memory-mapped array kind ('params', 'f' or 'Omega') of chunk c
+    def chunk_array(self, c, kind):
+        key = (c, kind)
+        if key not in self.arrays:
+            name = self.spec['chunks'][c]['name']
+            self.arrays[key] = np.load(os.path.join(self.path, f'{name}.{kind}.npy'), mmap_mode='r')
+        return self.arrays[key]
+
+    # parameter values of all written rows, their chunk and their row within
+    # it, and the sorted order of every column
+    def build_index(self):
+        nchunks = len(self.spec['chunks'])
+        rows = [chunk['rows'] for chunk in self.spec['chunks']]
+        params = np.concatenate([self.chunk_array(c, 'params') for c in range(nchunks)]) if nchunks \
+                 else np.zeros((0, len(self.columns)))
+        chunk_of = np.repeat(np.arange(nchunks), rows)
+        offset = np.arange(len(chunk_of)) - np.repeat(np.cumsum([0] + rows)[:-1], rows)
+        order = {col: np.argsort(params[:, i], kind='stable') for i, col in enumerate(self.columns)}
+        self.index = {'params': params, 'chunk': chunk_of, 'offset': offset, 'order': order,
+                      'sorted': {col: params[order[col], i] for i, col in enumerate(self.columns)}}
+        return self.index
+
+    # parameter values of all written rows, shape (len(store), len(columns))
+    @property
+    def params(self):
+        self.flush()
+        return (self.index or self.build_index())['params']
+
+    # rows whose parameters satisfy all conditions, sorted. A condition is
+    # column=value (equal up to rtol) or column=(low, high) (inclusive).
+    def select(self, rtol=1e-9, **conditions):
+        self.flush()
+        index = self.index or self.build_index()
+        rows = np.arange(len(index['params']))
+        for col, cond in conditions.items():
+            if col not in self.columns:
+                raise ValueError(f'unknown column {col}, choose from {self.columns}')
+            if np.ndim(cond) == 0:
+                low, high = cond - abs(cond) * rtol, cond + abs(cond) * rtol
+            else:
+                low, high = cond
+            values = index['sorted'][col]
+            start, end = np.searchsorted(values, low, side='left'), np.searchsorted(values, high, side='right')
+            rows = np.intersect1d(rows, index['order'][col][start:end], assume_unique=True)
+        return rows
+
+    # parameters, frequencies and spectrum of row i, as views of the chunk
+    def spectrum(self, i):
+        self.flush()
+        index = self.index or self.build_index()
+        c, j = index['chunk'][i], index['offset'][i]
+        return self.chunk_array(c, 'params')[j], self.chunk_array(c, 'f'), self.chunk_array(c, 'Omega')[j]
+
+    # parameters (len(rows), len(columns)), shared frequencies and spectra
+    # (len(rows), len(f)) of the rows. Rows forming a contiguous range of one
+    # chunk are returned as views, other selections are copied.
+    def load(self, rows):
+        self.flush()
+        index = self.index or self.build_index()
+        rows = np.asarray(rows, dtype=int)
+        chunks = np.unique(index['chunk'][rows])
+        f = self.chunk_array(chunks[0], 'f') if len(chunks) else np.zeros(0)
+        for c in chunks[1:]:
+            if not np.array_equal(self.chunk_array(c, 'f'), f):
+                raise ValueError('the selected spectra do not share their frequencies')
+        if len(chunks) == 1:
+            offsets = index['offset'][rows]
+            if np.array_equal(offsets, np.arange(offsets[0], offsets[0] + len(offsets))):
+                sl = slice(offsets[0], offsets[0] + len(offsets))
+                return self.chunk_array(chunks[0], 'params')[sl], f, self.chunk_array(chunks[0], 'Omega')[sl]
+        params = np.zeros((len(rows), len(self.columns)))
+        Omega = np.zeros((len(rows), len(f)))
+        for c in chunks:
+            where = np.nonzero(index['chunk'][rows] == c)[0]
+            offsets = index['offset'][rows[where]]
+            params[where] = self.chunk_array(c, 'params')[offsets]
+            Omega[where] = self.chunk_array(c, 'Omega')[offsets]
+        return params, f, Omega
+
+    # (params, Omega) of the rows one at a time, e.g. for snrpipeline.snr_stream
+    def stream(self, rows=None):
+        rows = range(len(self)) if rows is None else rows
+        for i in rows:
+            params, _, Omega = self.spectrum(i)
+            yield tuple(params), Omega
+
+# sink appending a stream of (params, Omega, ...) on the frequencies flist,
+# e.g. from snrpipeline.spectra or snr_stream, to the store at path.
+# Returns the number of spectra written.
+def write_store(stream, path, flist, columns=('Lambda', 'v')):
+    count = 0
+    with SpectrumStore(path, columns) as store:
+        for item in stream:
+            store.append(item[0], flist, item[1])
+            count += 1
+    return count
+
+# add the text files written by GWscanner.py and GWspectrumcalc.py, named
+# DWCSGW_<log10 Lambda>_<v>.txt or CSGW_<log10 Lambda>.txt, to the store at
+# path. A new store gets the columns Lambda and v, or Lambda only for CS files.
+def import_text(path, files):
+    pattern = re.compile(r'(?:DWCSGW|CSGW)_([-+\d.eE]+?)(?:_([-+\d.eE]+?))?\.txt$')
+    store = None
+    for file_path in files:
+        match = pattern.search(os.path.basename(file_path))
+        if match is None:
+            raise ValueError(f'cannot read the parameters from the name of {file_path}')
+        params = [10**float(match.group(1))] + ([float(match.group(2))] if match.group(2) else [])
+        if store is None:
+            store = SpectrumStore(path, ('Lambda', 'v')[:len(params)])
+        data = np.loadtxt(file_path)
+        store.append(params, data[:, 0], data[:, 1])
+    if store is not None:
+        store.flush()
+    return store
+
+# write the spectra of the rows (all by default) of the store at path to
+# out_dir as text files of two columns (frequency, Omega), named
+# DWCSGW_<log10 Lambda>_<v>.txt or CSGW_<log10 Lambda>.txt like the files
+# read by import_text. Returns the paths written.
+def export_text(path, out_dir, rows=None):
+    store = SpectrumStore(path)
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = 'DWCSGW' if 'v' in store.columns else 'CSGW'
+    paths = []
+    for i in range(len(store)) if rows is None else rows:
+        params, f, Omega = store.spectrum(i)
+        values = dict(zip(store.columns, params))
+        name = '_'.join([prefix, str(np.log10(values['Lambda']))] + ([str(values['v'])] if 'v' in values else []))
+        paths.append(os.path.join(out_dir, name + '.txt'))
+        np.savetxt(paths[-1], np.column_stack((f, Omega)))
+    return paths
+
+# the spectrum of the text file file_path, named as in import_text, as an
+# (n, 2) array of frequency and Omega. Only if a store is given with
+# store_path (e.g. DWCSGW_store or CSGW_store, where GWscanner.py and
+# GWspectrumcalc.py add their spectra) and it holds the same parameters, its
+# latest spectrum is returned instead, so that the scripts reading the text
+# files can be pointed at new scans.
+def load_spectrum(file_path, store_path=None):
+    pattern = re.compile(r'(?:DWCSGW|CSGW)_([-+\d.eE]+?)(?:_([-+\d.eE]+?))?\.txt$')
+    match = pattern.search(os.path.basename(file_path))
+    if store_path is not None and match is not None:
+        if os.path.exists(os.path.join(store_path, 'store.json')):
+            store = SpectrumStore(store_path)
+            params = [10**float(match.group(1))] + ([float(match.group(2))] if match.group(2) else [])
+            rows = store.select(**dict(zip(store.columns, params))) if len(params) == len(store.columns) else []
+            if len(rows):
+                _, f, Omega = store.spectrum(rows[-1])
+                return np.column_stack((f, Omega))
+    return np.loadtxt(file_path)
@@ -0,0 +1,116 @@
+"""
+This script measures the startup cost of the defect classes, i.e. the time to
+import gaugedcs and dwboundedbycs and to construct CosmicString and
+DWBoundedbyCS. Every worker process of GWscanner.py and every task of a
+cluster scan pays it, so each measurement runs in a fresh interpreter:
+
+    python startupbench.py [repeats]
+
+The median over the repeats is reported, together with the modules that
+the import pulled in among the heavy optional ones (e.g. sympy).
+
+The import of the other modules and scripts is measured the same way
+(IMPORTS), checking that importing them does no work of their own: nothing
+is printed, no figure is opened and no file is written to the working
+directory.
+
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DEFECTS = (('gaugedcs', 'CosmicString'), ('dwboundedbycs', 'DWBoundedbyCS'))
+
+HEAVY_MODULES = ('sympy', 'matplotlib', 'numba')
+
+# the modules and scripts whose plain import is measured
+IMPORTS = ('gaugedcs', 'dwboundedbycs', 'snrgeneric', 'plotinterferometer', 'GWplotter', 'batchplot',
+           'snr2hdm', 'snrCS10', 'GWscanner', 'GWspectrumcalc', 'parallelscan', 'cosmicstringgw', 'benchmarks')
+
+# run in the fresh interpreter: time the import of the module and the
+# construction of the class, and list the heavy modules that were loaded
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+getattr(module, sys.argv[2])()
+constructed = time.perf_counter()
+print(json.dumps({'import': imported - start, 'construct': constructed - imported,
+                  'heavy': [name for name in sys.argv[3:] if name in sys.modules]}))
+"""
+
+# run in the fresh interpreter, with an empty working directory: time the
+# import of the module and report what it printed, the figures it opened
+# and the files it wrote
+IMPORT_CHILD = """
+import io, json, os, sys, time, contextlib
+sys.path.insert(0, sys.argv[2])
+output = io.StringIO()
+start = time.perf_counter()
+with contextlib.redirect_stdout(output):
+    __import__(sys.argv[1])
+imported = time.perf_counter()
+figures = len(sys.modules['matplotlib.pyplot'].get_fignums()) if 'matplotlib.pyplot' in sys.modules else 0
+print(json.dumps({'import': imported - start, 'printed': len(output.getvalue()), 'figures': figures,
+                  'files': sorted(os.listdir('.')),
+                  'heavy': [name for name in sys.argv[3:] if name in sys.modules]}))
+"""
+
+# one measurement of module.class_name in a fresh interpreter, run in the
+# package directory, where the classes find their data files
+def measure_once(module, class_name):
+    package = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, '-c', CHILD, module, class_name, *HEAVY_MODULES],
+                            capture_output=True, text=True, check=True, cwd=package).stdout
+    return json.loads(output.splitlines()[-1])
+
+# median import and construction times in seconds over repeats fresh
+# interpreters, and the heavy modules loaded
+def measure_startup(module, class_name, repeats=5):
+    runs = [measure_once(module, class_name) for _ in range(repeats)]
+    return {'import': statistics.median(run['import'] for run in runs),
+            'construct': statistics.median(run['construct'] for run in runs),
+            'heavy': runs[-1]['heavy']}
+
+# startup times of all defect classes, keyed by class name
+def startup_times(repeats=5):
+    return {class_name: measure_startup(module, class_name, repeats) for module, class_name in DEFECTS}
+
+# one measurement of the import of module in a fresh interpreter, run in
+# an empty temporary directory with the package on the path
+def measure_import_once(module):
+    package = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable, '-c', IMPORT_CHILD, module, package, *HEAVY_MODULES],
+                                capture_output=True, text=True, check=True, cwd=directory,
+                                env=dict(os.environ, MPLBACKEND='Agg')).stdout
+    return json.loads(output.splitlines()[-1])
+
+# median import time in seconds over repeats fresh interpreters, the heavy
+# modules loaded and whether the import had side effects (output, figures,
+# files); side_effects lists them
+def measure_import(module, repeats=5):
+    runs = [measure_import_once(module) for _ in range(repeats)]
+    run = runs[-1]
+    side_effects = ([f"printed {run['printed']} characters"] if run['printed'] else []) + \
+                   ([f"opened {run['figures']} figures"] if run['figures'] else []) + \
+                   ([f"wrote {', '.join(run['files'])}"] if run['files'] else [])
+    return {'import': statistics.median(run['import'] for run in runs),
+            'heavy': run['heavy'], 'side_effects': side_effects}
+
+# import times of all the modules in IMPORTS, keyed by module name
+def import_times(repeats=5):
+    return {module: measure_import(module, repeats) for module in IMPORTS}
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for class_name, times in startup_times(repeats).items():
+        print(f"{class_name:15s} import {1e3 * times['import']:8.1f} ms  "
+              f"construct {1e3 * times['construct']:8.1f} ms  heavy modules: {', '.join(times['heavy']) or 'none'}")
+    for module, times in import_times(repeats).items():
+        print(f"{module:20s} import {1e3 * times['import']:8.1f} ms  heavy modules: {', '.join(times['heavy']) or 'none'}"
+              f"  side effects: {'; '.join(times['side_effects']) or 'none'}")